@@ -2,27 +2,50 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_session import Session
 from flask_migrate import Migrate # type: ignore
-from pymongo import MongoClient
 from .config import Config
+from .embeddings import EmbeddingCache
+from .mongo import MongoRepository
+from .metrics import metrics
 
 db = SQLAlchemy()
 migrate = Migrate()
 sess = Session()
-
-mongo_client = MongoClient('mongodb://localhost:27017/')
-mongodb = mongo_client['applications']
-applications_collection = mongodb['applications']
+embedding_cache = EmbeddingCache()
+mongo = MongoRepository()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # First, so that request timings include the other extensions' before_request hooks
+    metrics.init_app(app)
     db.init_app(app)  
-    migrate.init_app(app, db)
+    # Batch mode lets autogenerated migrations alter SQLite tables
+    migrate.init_app(app, db, render_as_batch=True)
     sess.init_app(app)
+    embedding_cache.init_app(app)
+    mongo.init_app(app)
 
     with app.app_context():
         from .routes import main as main_blueprint
+        from .utils import embedding_batcher, job_index, cv_index, job_search_index, llm_client
+        from .commands import screen_candidates_command, rebuild_analytics_command, ingest_cvs_command, export_encoder_command, create_mongo_indexes_command
+        from .tasks import task_queue
+        from .interview_store import interview_store
+        from .ingest import cv_ingestor
         app.register_blueprint(main_blueprint)
+        app.cli.add_command(screen_candidates_command)
+        app.cli.add_command(rebuild_analytics_command)
+        app.cli.add_command(ingest_cvs_command)
+        app.cli.add_command(export_encoder_command)
+        app.cli.add_command(create_mongo_indexes_command)
+        embedding_batcher.init_app(app)
+        job_index.init_app(app)
+        cv_index.init_app(app)
+        job_search_index.init_app(app)
+        llm_client.init_app(app)
+        task_queue.init_app(app)
+        interview_store.init_app(app)
+        cv_ingestor.init_app(app)
 
         return app
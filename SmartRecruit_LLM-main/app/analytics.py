@@ -0,0 +1,220 @@
+from datetime import datetime
+
+from . import mongo
+
+# Same buckets as the dashboard's age distribution chart
+AGE_BUCKETS = [(18, 25, '18-25'), (26, 35, '26-35'), (36, 45, '36-45'), (46, 55, '46-55'), (56, None, '56+')]
+TOP_CANDIDATES = 10
+MAX_CANDIDATES = 500
+STATUSES = ('Pending', 'Accepted', 'Rejected')
+
+
+def age_bucket(birthday):
+    """
+    Maps a birthday to its age bucket.
+
+    Args:
+        birthday (str): The birthday formatted as YYYY-MM-DD.
+
+    Returns:
+        str: The bucket label, or None if the age is unknown or under 18.
+    """
+    try:
+        born = datetime.strptime(birthday, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+    today = datetime.now()
+    age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+    for low, high, label in AGE_BUCKETS:
+        if age >= low and (high is None or age <= high):
+            return label
+    return None
+
+
+def score_bucket(total_score):
+    """
+    Maps an interview's total score (10 questions scored out of 10) to a histogram bucket.
+
+    Args:
+        total_score (int): The total score.
+
+    Returns:
+        str: The bucket label, e.g. '70-79'.
+    """
+    low = min(max(int(total_score) // 10 * 10, 0), 90)
+    return f"{low}-{low + 9}" if low < 90 else "90-100"
+
+
+def _similarity(application):
+    try:
+        return float(application.message)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _candidate(application, feedback_list):
+    total_score = sum(fb['score'] for fb in feedback_list if fb.get('score') is not None)
+    return {
+        'app_id': application.id,
+        'name': f"{application.user.first_name} {application.user.last_name}",
+        'score': total_score,
+        'similarity': _similarity(application)
+    }
+
+
+def _empty_aggregate(job_id):
+    return {
+        'job_id': str(job_id),
+        'counts': dict({status: 0 for status in STATUSES}, total=0),
+        'score_histogram': {},
+        'age_buckets': {},
+        'top_candidates': [],
+        'all_candidates': []
+    }
+
+
+def record_application(application, feedback_list):
+    """
+    Folds a newly submitted application into its job's aggregate.
+
+    Args:
+        application (Application): The stored application, with its user loaded.
+        feedback_list (list): The scored feedback of the interview.
+    """
+    candidate = _candidate(application, feedback_list)
+    increments = {
+        'counts.total': 1,
+        f"counts.{application.status}": 1,
+        f"score_histogram.{score_bucket(candidate['score'])}": 1
+    }
+    bucket = age_bucket(application.user.birthday)
+    if bucket:
+        increments[f"age_buckets.{bucket}"] = 1
+
+    update = {
+        '$inc': increments,
+        '$push': {
+            # $sort + $slice keeps a bounded top-k, like a heap, in a single atomic update
+            'top_candidates': {'$each': [candidate], '$sort': {'score': -1}, '$slice': TOP_CANDIDATES},
+            'all_candidates': {'$each': [{'name': candidate['name'], 'totalScore': candidate['score']}],
+                               '$slice': -MAX_CANDIDATES}
+        }
+    }
+    result = mongo.analytics.update_one({'job_id': str(application.job_id)}, update)
+    if result.matched_count == 0:
+        # No aggregate yet: create an empty one, then apply the update. Rebuilding from the
+        # raw data instead would also count concurrent first applications, which apply their
+        # own update as well. Older applications are folded in by `flask rebuild-analytics`.
+        mongo.replace_job_analytics([_empty_aggregate(application.job_id)], only_missing=True)
+        mongo.analytics.update_one({'job_id': str(application.job_id)}, update)
+
+
+def record_status_change(job_id, old_status, new_status):
+    """
+    Moves an application between status counters of its job's aggregate.
+
+    Args:
+        job_id (int): The job of the application.
+        old_status (str): The previous status.
+        new_status (str): The new status.
+    """
+    if old_status == new_status:
+        return
+    result = mongo.analytics.update_one({'job_id': str(job_id)}, {
+        '$inc': {f"counts.{old_status}": -1, f"counts.{new_status}": 1}
+    })
+    if result.matched_count == 0:
+        rebuild_job_analytics(job_id)
+
+
+def delete_job_analytics(job_id):
+    """
+    Drops the aggregate of a deleted job.
+
+    Args:
+        job_id (int): The deleted job.
+    """
+    mongo.delete_job_analytics(job_id)
+
+
+def build_job_analytics(job_ids):
+    """
+    Computes the aggregates of jobs from their applications and interview documents,
+    with one SQL query and one MongoDB query for all of them.
+
+    Args:
+        job_ids (list): The jobs.
+
+    Returns:
+        list: The aggregate documents, one per job.
+    """
+    from sqlalchemy.orm import joinedload
+    from .models import Application
+
+    applications = Application.query.options(joinedload(Application.user)) \
+        .filter(Application.job_id.in_(job_ids)).all()
+    feedback_by_application = mongo.get_scores([app.id for app in applications])
+
+    documents = {job_id: _empty_aggregate(job_id) for job_id in job_ids}
+    for app in applications:
+        document = documents[app.job_id]
+        candidate = _candidate(app, feedback_by_application.get(str(app.id), []))
+        document['counts']['total'] += 1
+        document['counts'][app.status] = document['counts'].get(app.status, 0) + 1
+        bucket = score_bucket(candidate['score'])
+        document['score_histogram'][bucket] = document['score_histogram'].get(bucket, 0) + 1
+        bucket = age_bucket(app.user.birthday)
+        if bucket:
+            document['age_buckets'][bucket] = document['age_buckets'].get(bucket, 0) + 1
+        document['top_candidates'].append(candidate)
+        document['all_candidates'].append({'name': candidate['name'], 'totalScore': candidate['score']})
+
+    for document in documents.values():
+        document['top_candidates'] = sorted(document['top_candidates'], key=lambda x: x['score'], reverse=True)[:TOP_CANDIDATES]
+        document['all_candidates'] = document['all_candidates'][-MAX_CANDIDATES:]
+    return list(documents.values())
+
+
+def rebuild_job_analytics(job_id):
+    """
+    Recomputes a job's aggregate from the applications and interview documents.
+    Used for jobs whose applications predate the aggregates.
+
+    Args:
+        job_id (int): The job to rebuild.
+
+    Returns:
+        dict: The aggregate document.
+    """
+    # Don't overwrite an aggregate another worker created in the meantime
+    mongo.replace_job_analytics(build_job_analytics([job_id]), only_missing=True)
+    return mongo.get_job_analytics(job_id)
+
+
+def rebuild_all_job_analytics(job_ids, batch_size=100):
+    """
+    Recomputes the aggregates of many jobs, overwriting the current ones, with one
+    bulk write per batch of jobs.
+
+    Args:
+        job_ids (list): The jobs.
+        batch_size (int): The number of jobs read and written at a time.
+    """
+    for start in range(0, len(job_ids), batch_size):
+        mongo.replace_job_analytics(build_job_analytics(job_ids[start:start + batch_size]))
+
+
+def get_job_analytics(job_id):
+    """
+    Reads a job's aggregate, building it on first access.
+
+    Args:
+        job_id (int): The job.
+
+    Returns:
+        dict: The aggregate document.
+    """
+    document = mongo.get_job_analytics(job_id)
+    if document is None:
+        document = rebuild_job_analytics(job_id)
+    return document
@@ -0,0 +1,97 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with least-recently-used eviction and an optional
+    time-to-live per entry. Keeps hit and miss counters for reporting.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Looks up an entry, treating expired entries as misses.
+
+        Args:
+            key (hashable): The cache key.
+            default: The value returned on a miss.
+
+        Returns:
+            The cached value, or `default` on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores an entry, evicting the least recently used ones if the cache is full.
+
+        Args:
+            key (hashable): The cache key.
+            value: The value to store.
+            ttl (float): Seconds until the entry expires, overriding the cache default.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Removes an entry if present.
+
+        Args:
+            key (hashable): The cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Removes every entry whose key matches a predicate.
+
+        Args:
+            predicate (callable): Function returning True for keys to remove.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        """
+        The fraction of lookups that were hits since the cache was created.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,148 @@
+import re
+import numpy as np
+
+# Headings commonly used to split CVs and job descriptions into sections
+SECTION_HEADINGS = {
+    'summary', 'profile', 'about', 'about me', 'objective', 'experience', 'work experience', 'professional experience',
+    'employment', 'employment history', 'education', 'skills', 'technical skills', 'projects', 'certifications',
+    'languages', 'interests', 'publications', 'awards', 'volunteering', 'references', 'responsibilities',
+    'requirements', 'qualifications', 'what you will do', 'what we offer', 'benefits', 'about the role',
+    'about us', 'nice to have', 'preferred qualifications', 'job description'
+}
+
+
+def is_heading(line):
+    """
+    Guesses whether a line is a section heading: a known heading, or a short line in
+    capitals or ending with a colon.
+
+    Args:
+        line (str): The stripped line.
+
+    Returns:
+        bool: True if the line looks like a heading.
+    """
+    words = line.split()
+    if not words or len(words) > 5:
+        return False
+    normalized = line.rstrip(':').strip().lower()
+    return normalized in SECTION_HEADINGS or line.endswith(':') or (line.isupper() and len(line) > 3)
+
+
+def split_sections(text, heading=''):
+    """
+    Splits text into (heading, body) sections on heading lines.
+
+    Args:
+        text (str): The raw text, with its line breaks.
+        heading (str): The heading of the text before the first heading line, e.g. the
+            section a previous page ended in.
+
+    Returns:
+        list: (heading, body) pairs.
+    """
+    sections = []
+    lines = []
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if is_heading(line):
+            if lines:
+                sections.append((heading, ' '.join(lines)))
+            heading, lines = line.rstrip(':').strip(), []
+        else:
+            lines.append(line)
+    if lines:
+        sections.append((heading, ' '.join(lines)))
+    return sections
+
+
+class PageChunker:
+    """
+    Chunks a document page by page, so chunks can be encoded while later pages are
+    still being parsed. Windows never span two pages or two sections, and a section
+    that continues on the next page keeps its heading.
+    """
+
+    def __init__(self, max_words=200, overlap=50):
+        self.max_words = max_words
+        self.step = max(1, max_words - overlap)
+        self.overlap = overlap
+        self.heading = ''
+
+    def feed(self, page):
+        """
+        Chunks the next page.
+
+        Args:
+            page (str): The text of the page.
+
+        Returns:
+            list: The chunks of the page, in order.
+        """
+        chunks = []
+        sections = split_sections(page, self.heading)
+        for heading, body in sections:
+            words = re.sub(r'\s+', ' ', body).split(' ')
+            prefix = f"{heading}: " if heading else ''
+            for start in range(0, max(1, len(words) - self.overlap), self.step):
+                chunks.append(prefix + ' '.join(words[start:start + self.max_words]))
+        if sections:
+            self.heading = sections[-1][0]
+        return chunks
+
+
+def chunk_text(text, max_words=200, overlap=50):
+    """
+    Splits text into overlapping windows that fit the encoder's input length.
+
+    Windows never span two sections or pages (form feeds), and each is prefixed with
+    its section heading so a chunk such as a list of skills keeps its context.
+    Punctuation is kept, unlike `preprocess_text`, since the encoder was trained on
+    natural text.
+
+    Args:
+        text (str): The raw text, with its line breaks.
+        max_words (int): The maximum number of words per chunk (mpnet reads 384 tokens, about 250 words).
+        overlap (int): The number of words shared by consecutive chunks of a section.
+
+    Returns:
+        list: The chunks, in document order. Empty text gives no chunks.
+    """
+    chunker = PageChunker(max_words, overlap)
+    return [chunk for page in (text or '').split('\f') for chunk in chunker.feed(page)]
+
+
+def max_sim(cv_vectors, job_vectors, aggregate='max', top_k=3):
+    """
+    Scores a CV against a job from their chunk embeddings.
+
+    Every job chunk is matched with its most similar CV chunk. 'max' returns the best of
+    these matches; 'mean_top_k' averages the `top_k` best, which rewards CVs that cover
+    several parts of the job rather than a single one.
+
+    Args:
+        cv_vectors (numpy.ndarray): The CV chunk embeddings, one per row.
+        job_vectors (numpy.ndarray): The job chunk embeddings, one per row.
+        aggregate (str): 'max' or 'mean_top_k'.
+        top_k (int): The number of matches averaged by 'mean_top_k'.
+
+    Returns:
+        float: The cosine similarity score.
+    """
+    cv_vectors = _normalize_rows(cv_vectors)
+    job_vectors = _normalize_rows(job_vectors)
+    if not len(cv_vectors) or not len(job_vectors):
+        return 0.0
+    best_matches = (job_vectors @ cv_vectors.T).max(axis=1)
+    if aggregate == 'mean_top_k':
+        k = min(top_k, len(best_matches))
+        return float(np.sort(best_matches)[-k:].mean())
+    return float(best_matches.max())
+
+
+def _normalize_rows(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
@@ -0,0 +1,120 @@
+import os
+import time
+import click
+from flask.cli import with_appcontext
+
+from . import db, mongo
+from .models import Job, User
+from .analytics import rebuild_all_job_analytics
+from .encoders import export_onnx, quantize_onnx
+from .ingest import cv_ingestor
+from .utils import screen_candidates, file_hash, get_cached_embeddings
+
+
+@click.command('screen-candidates')
+@click.argument('job_id', type=int)
+@click.option('--top', default=20, show_default=True, help='Number of candidates to print.')
+@with_appcontext
+def screen_candidates_command(job_id, top):
+    """
+    Ranks every stored CV against the job JOB_ID and prints the best matches.
+    """
+    job = Job.query.get(job_id)
+    if job is None:
+        raise click.ClickException(f"Job {job_id} not found.")
+
+    start = time.perf_counter()
+    candidates, total = screen_candidates(job, page=1, per_page=top)
+    elapsed = time.perf_counter() - start
+
+    click.echo(f"Top {len(candidates)} of {total} CVs for '{job.title}' ({elapsed * 1000:.1f} ms)")
+    for rank, (user, score) in enumerate(candidates, start=1):
+        click.echo(f"{rank:>4}. {score:.3f}  {user.first_name} {user.last_name} <{user.email}>")
+
+
+@click.command('rebuild-analytics')
+@click.option('--job-id', type=int, default=None, help='Only rebuild this job.')
+@with_appcontext
+def rebuild_analytics_command(job_id):
+    """
+    Recomputes the dashboard aggregates from the stored applications.
+    """
+    job_ids = [job_id] if job_id is not None else [job_id for (job_id,) in Job.query.with_entities(Job.id)]
+    rebuild_all_job_analytics(job_ids)
+    click.echo(f"Rebuilt analytics for {len(job_ids)} job(s).")
+
+
+@click.command('create-mongo-indexes')
+@with_appcontext
+def create_mongo_indexes_command():
+    """
+    Creates the MongoDB indexes the application relies on. Existing indexes are left
+    as they are, so it is safe to run on every deploy.
+    """
+    start = time.perf_counter()
+    try:
+        mongo.create_indexes()
+    except Exception as e:
+        raise click.ClickException(f"Failed to create MongoDB indexes: {e}")
+    click.echo(f"Created MongoDB indexes in {time.perf_counter() - start:.2f}s.")
+
+
+@click.command('ingest-cvs')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False), required=False)
+@click.option('--embed/--no-embed', default=False, show_default=True, help='Also precompute the CV embeddings.')
+@with_appcontext
+def ingest_cvs_command(directory, embed):
+    """
+    Extracts the text of every PDF in DIRECTORY (default: the CV upload folder) on the
+    ingestion worker pool, caches it by file hash and stores it on the users whose CV
+    file it is. Prints the throughput in pages per second.
+    """
+    from flask import current_app
+
+    directory = directory or current_app.config['UPLOAD_FOLDER_CV']
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith('.pdf'))
+    if not paths:
+        raise click.ClickException(f"No PDF files in {directory}.")
+
+    start = time.perf_counter()
+    hashes = [file_hash(path) for path in paths]
+    users = {user.cv_file: user for user in User.query.filter(User.cv_file.in_([os.path.basename(p) for p in paths]))}
+    total_pages, failed, texts = 0, 0, []
+    for (path, text, pages, error), cv_hash in zip(cv_ingestor.ingest_many(paths, hashes), hashes):
+        if error is not None:
+            failed += 1
+            click.echo(f"  FAILED {os.path.basename(path)}: {error}")
+            continue
+        total_pages += pages
+        texts.append(text)
+        user = users.get(os.path.basename(path))
+        if user is not None and user.cv_hash != cv_hash:
+            user.cv_hash, user.cv_text = cv_hash, text
+    db.session.commit()
+    elapsed = time.perf_counter() - start
+    click.echo(f"Parsed {len(paths) - failed} of {len(paths)} PDFs, {total_pages} pages in {elapsed:.2f}s "
+               f"({total_pages / elapsed:.1f} pages/sec, {cv_ingestor.workers} workers).")
+
+    if embed and texts:
+        start = time.perf_counter()
+        for offset in range(0, len(texts), 64):
+            get_cached_embeddings(texts[offset:offset + 64])
+        click.echo(f"Embedded {len(texts)} CVs in {time.perf_counter() - start:.2f}s.")
+
+
+@click.command('export-encoder')
+@click.option('--quantize/--no-quantize', default=True, show_default=True, help='Also write the int8 model.')
+@with_appcontext
+def export_encoder_command(quantize):
+    """
+    Exports the similarity model to ENCODER_ONNX_DIR for the 'onnx' and 'onnx-int8'
+    encoder backends. Run it at build time so servers never need torch to load the model.
+    """
+    from flask import current_app
+
+    directory = current_app.config['ENCODER_ONNX_DIR']
+    start = time.perf_counter()
+    export_onnx(current_app.config['MODEL_NAME'], directory)
+    if quantize:
+        quantize_onnx(directory)
+    click.echo(f"Exported {current_app.config['MODEL_NAME']} to {directory} in {time.perf_counter() - start:.2f}s.")
@@ -7,9 +7,82 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'TESTINGCHEATS123'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///site.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SESSION_TYPE = 'filesystem'
+    SESSION_TYPE = os.environ.get('SESSION_TYPE') or 'filesystem'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    # Prometheus text endpoint at /metrics, behind 'Authorization: Bearer <METRICS_TOKEN>'.
+    # It reveals routes, traffic and LLM usage, so it is only served when a token is set.
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true' if METRICS_TOKEN else 'false').lower() == 'true'
     UPLOAD_FOLDER_CV = os.path.join('app', 'static', 'uploads', 'cv')
     UPLOAD_FOLDER_PHOTOS = os.path.join('app', 'static', 'uploads', 'photos')
     API_TOKEN = os.environ.get('API_TOKEN', 'default_api_token')
-    API_URL = "https://api-inference.huggingface.co/models/meta-llama/Meta-Llama-3-8B-Instruct"
-    MONGO_URI = 'mongodb://localhost:27017/applications'
+    API_URL = os.environ.get('API_URL') or "https://api-inference.huggingface.co/models/meta-llama/Meta-Llama-3-8B-Instruct"
+    # 'mongomock://localhost/applications' runs on an in-memory stand-in (requires mongomock)
+    MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/applications'
+    # How long a MongoDB operation waits for a reachable server, instead of pymongo's 30 seconds
+    MONGO_TIMEOUT_MS = int(os.environ.get('MONGO_TIMEOUT_MS', 5000))
+    MODEL_NAME = os.environ.get('MODEL_NAME') or 'multi-qa-mpnet-base-dot-v1'
+    # Inference backend of the similarity model: 'torch', 'torch-int8', 'onnx' or 'onnx-int8'
+    ENCODER_BACKEND = os.environ.get('ENCODER_BACKEND') or 'torch'
+    ENCODER_ONNX_DIR = os.environ.get('ENCODER_ONNX_DIR') or os.path.join('instance', 'onnx', MODEL_NAME.replace('/', '__'))
+    EMBEDDING_CACHE_DIR = os.environ.get('EMBEDDING_CACHE_DIR') or os.path.join('instance', 'embeddings')
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get('EMBEDDING_CACHE_MAX_ENTRIES', 10000))
+    EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.environ.get('EMBEDDING_CACHE_MEMORY_ENTRIES', 512))
+    EMBEDDING_BATCHING = os.environ.get('EMBEDDING_BATCHING', 'true').lower() == 'true'
+    EMBEDDING_BATCH_SIZE = int(os.environ.get('EMBEDDING_BATCH_SIZE', 32))
+    EMBEDDING_BATCH_WAIT_MS = float(os.environ.get('EMBEDDING_BATCH_WAIT_MS', 5))
+    # 'single' embeds whole texts (truncated by the model), 'chunked' scores overlapping chunks with max-sim
+    SIMILARITY_MODE = os.environ.get('SIMILARITY_MODE') or 'single'
+    INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', min(4, os.cpu_count() or 1)))
+    INGEST_MAX_PAGES = int(os.environ.get('INGEST_MAX_PAGES', 20))
+    INGEST_TIMEOUT_SECONDS = float(os.environ.get('INGEST_TIMEOUT_SECONDS', 30))
+    INGEST_PAGES_PER_TASK = int(os.environ.get('INGEST_PAGES_PER_TASK', 2))
+    INGEST_CACHE_DIR = os.environ.get('INGEST_CACHE_DIR') or os.path.join('instance', 'cv_text')
+    CHUNK_WORDS = int(os.environ.get('CHUNK_WORDS', 200))
+    CHUNK_OVERLAP_WORDS = int(os.environ.get('CHUNK_OVERLAP_WORDS', 50))
+    CHUNK_AGGREGATE = os.environ.get('CHUNK_AGGREGATE') or 'mean_top_k'
+    CHUNK_TOP_K = int(os.environ.get('CHUNK_TOP_K', 3))
+    VECTOR_INDEX_BACKEND = os.environ.get('VECTOR_INDEX_BACKEND') or 'numpy'
+    VECTOR_INDEX_REFRESH_SECONDS = float(os.environ.get('VECTOR_INDEX_REFRESH_SECONDS', 30))
+    RECOMMENDED_JOBS_COUNT = int(os.environ.get('RECOMMENDED_JOBS_COUNT', 5))
+    JOBS_PER_PAGE = int(os.environ.get('JOBS_PER_PAGE', 20))
+    # Rendered job descriptions and listing pages kept in memory by each worker
+    PAGE_CACHE_ENTRIES = int(os.environ.get('PAGE_CACHE_ENTRIES', 2048))
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 200))
+    # Share of the embedding similarity in the search ranking, 0 for keyword-only ranking
+    SEARCH_HYBRID_WEIGHT = float(os.environ.get('SEARCH_HYBRID_WEIGHT', 0.3))
+    SEARCH_QUERY_CACHE_ENTRIES = int(os.environ.get('SEARCH_QUERY_CACHE_ENTRIES', 256))
+    SCREENING_MAX_RESULTS = int(os.environ.get('SCREENING_MAX_RESULTS', 1000))
+    SCREENING_CACHE_ENTRIES = int(os.environ.get('SCREENING_CACHE_ENTRIES', 256))
+    SCREENING_PER_PAGE = int(os.environ.get('SCREENING_PER_PAGE', 20))
+    DASHBOARD_RESPONSES_PER_PAGE = int(os.environ.get('DASHBOARD_RESPONSES_PER_PAGE', 10))
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 5))
+    LLM_RATE_LIMIT = float(os.environ.get('LLM_RATE_LIMIT', 2))
+    LLM_RATE_BURST = int(os.environ.get('LLM_RATE_BURST', 5))
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', 5))
+    LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT', 60))
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 6))
+    LLM_DEADLINE_SECONDS = float(os.environ.get('LLM_DEADLINE_SECONDS', 120))
+    LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', 1))
+    LLM_BACKOFF_CAP = float(os.environ.get('LLM_BACKOFF_CAP', 30))
+    LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', 10))
+    # Stream question generation so the interview can start with the first question
+    LLM_STREAMING = os.environ.get('LLM_STREAMING', 'true').lower() == 'true'
+    # 'batched' scores up to FEEDBACK_BATCH_SIZE responses per prompt, 'per_question' sends one prompt each
+    FEEDBACK_MODE = os.environ.get('FEEDBACK_MODE') or 'batched'
+    FEEDBACK_BATCH_SIZE = int(os.environ.get('FEEDBACK_BATCH_SIZE', 10))
+    # Score each response in the background as soon as it is submitted during the interview
+    FEEDBACK_PIPELINED = os.environ.get('FEEDBACK_PIPELINED', 'true').lower() == 'true'
+    # How long submitting an application waits for responses still being scored before scoring them itself
+    FEEDBACK_WAIT_SECONDS = float(os.environ.get('FEEDBACK_WAIT_SECONDS', 60))
+    QUESTION_CACHE_ENTRIES = int(os.environ.get('QUESTION_CACHE_ENTRIES', 1024))
+    QUESTION_CACHE_TTL_SECONDS = int(os.environ.get('QUESTION_CACHE_TTL_SECONDS', 24 * 3600))
+    # 'sqlite:///<path>' for a single node, 'redis://host:port/db' to share interviews between nodes
+    INTERVIEW_STORE_URL = os.environ.get('INTERVIEW_STORE_URL') or 'sqlite:///' + os.path.join('instance', 'interviews.db')
+    INTERVIEW_TTL_SECONDS = int(os.environ.get('INTERVIEW_TTL_SECONDS', 2 * 3600))
+    INTERVIEW_GC_SECONDS = float(os.environ.get('INTERVIEW_GC_SECONDS', 300))
+    TASK_WORKERS = int(os.environ.get('TASK_WORKERS', 4))
+    # A task pending, or running without a heartbeat, for this long is taken over by another worker
+    TASK_RECOVER_AFTER_SECONDS = int(os.environ.get('TASK_RECOVER_AFTER_SECONDS', 60))
+    TASK_RECOVER_INTERVAL_SECONDS = float(os.environ.get('TASK_RECOVER_INTERVAL_SECONDS', 30))
+    TASK_MAX_ATTEMPTS = int(os.environ.get('TASK_MAX_ATTEMPTS', 3))
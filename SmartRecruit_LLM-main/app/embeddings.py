@@ -0,0 +1,257 @@
+import os
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+
+
+def content_hash(text):
+    """
+    Computes the cache key for a piece of (already preprocessed) text.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The hex SHA-256 digest of the text.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def cosine_similarity(a, b):
+    """
+    Computes the cosine similarity between two vectors.
+
+    Args:
+        a (numpy.ndarray): The first vector.
+        b (numpy.ndarray): The second vector.
+
+    Returns:
+        float: The cosine similarity, or 0.0 if either vector is zero.
+    """
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    if norm == 0:
+        return 0.0
+    return float(np.dot(a, b) / norm)
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of text embeddings keyed by the hash of the text they were computed from.
+
+    Vectors are stored as .npy files in a directory shared by all workers, with a small
+    in-memory LRU in front of it. Because keys are content hashes, an edited text simply
+    maps to a new key; invalidation only reclaims the space of the old entry.
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.max_entries = 0
+        self.max_memory_entries = 0
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the cache from the application config and indexes existing entries.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.directory = app.config['EMBEDDING_CACHE_DIR']
+        # Vectors of the quantized / ONNX backends differ slightly from the torch ones;
+        # keep them apart so switching backends never mixes the two in one comparison
+        backend = app.config.get('ENCODER_BACKEND', 'torch')
+        if backend != 'torch':
+            self.directory = os.path.join(self.directory, backend)
+        self.max_entries = app.config['EMBEDDING_CACHE_MAX_ENTRIES']
+        self.max_memory_entries = app.config['EMBEDDING_CACHE_MEMORY_ENTRIES']
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Rebuild the recency index from file modification times
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.npy'):
+                path = os.path.join(self.directory, filename)
+                entries.append((os.path.getmtime(path), filename[:-len('.npy')]))
+        with self._lock:
+            self._memory.clear()
+            self._disk = OrderedDict((key, None) for _, key in sorted(entries))
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key):
+        """
+        Looks up an embedding by key.
+
+        Args:
+            key (str): The content hash of the embedded text.
+
+        Returns:
+            numpy.ndarray: The cached embedding, or None on a miss.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                return self._memory[key]
+
+        try:
+            vector = np.load(self._path(key))
+        except (FileNotFoundError, ValueError, OSError):
+            # Another worker may have evicted or invalidated the entry
+            with self._lock:
+                self._disk.pop(key, None)
+            return None
+
+        with self._lock:
+            self._disk[key] = None
+            self._disk.move_to_end(key)
+            self._remember(key, vector)
+        return vector
+
+    def set(self, key, vector):
+        """
+        Stores an embedding, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (str): The content hash of the embedded text.
+            vector (numpy.ndarray): The embedding to store.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, vector)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logging.error(f"Failed to persist embedding {key}: {e}")
+
+        with self._lock:
+            self._remember(key, vector)
+            self._disk[key] = None
+            self._disk.move_to_end(key)
+            evicted = []
+            while len(self._disk) > self.max_entries:
+                evicted.append(self._disk.popitem(last=False)[0])
+        for old_key in evicted:
+            self._remove_file(old_key)
+
+    def invalidate(self, key):
+        """
+        Removes an embedding from the cache.
+
+        Args:
+            key (str): The content hash of the embedded text.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+            self._disk.pop(key, None)
+        self._remove_file(key)
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _remove_file(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for a sentence encoder.
+
+    Concurrent callers enqueue single texts; a background thread collects them for at
+    most `max_wait` seconds or `max_batch_size` items, encodes them in one call and
+    hands every caller its own vector.
+    """
+
+    def __init__(self, encode_fn, app=None):
+        self.encode_fn = encode_fn
+        self.enabled = False
+        self.max_batch_size = 32
+        self.max_wait = 0.005
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures batching from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.enabled = app.config['EMBEDDING_BATCHING']
+        self.max_batch_size = app.config['EMBEDDING_BATCH_SIZE']
+        self.max_wait = app.config['EMBEDDING_BATCH_WAIT_MS'] / 1000
+
+    def encode(self, text):
+        """
+        Encodes a single text, batching it with other concurrent requests when enabled.
+
+        Args:
+            text (str): The text to encode.
+
+        Returns:
+            numpy.ndarray: The embedding of the text.
+        """
+        if not self.enabled:
+            return self.encode_fn([text])[0]
+
+        future = Future()
+        self._ensure_worker().put((text, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so every worker process starts its own
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def _run(self, requests):
+        while True:
+            batch = [requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = self.encode_fn([text for text, _ in batch])
+            except Exception as e:
+                logging.error(f"Batched encode of {len(batch)} texts failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
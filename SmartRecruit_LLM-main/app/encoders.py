@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import logging
+import numpy as np
+
+from .metrics import ENCODE_SECONDS, ENCODED_TEXTS
+
+# Values of ENCODER_BACKEND
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+
+
+class TorchEncoder:
+    """
+    The sentence transformer model on PyTorch, in float32. The reference backend.
+    """
+
+    name = 'torch'
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer  # type: ignore
+        self.model = SentenceTransformer(model_name, device='cpu')
+
+    @property
+    def max_seq_length(self):
+        return self.model.max_seq_length
+
+    def encode(self, sentences, batch_size=32):
+        """
+        Encodes text into embeddings.
+
+        Args:
+            sentences (str or list): One text or a list of texts.
+            batch_size (int): The number of texts per forward pass.
+
+        Returns:
+            numpy.ndarray: One embedding, or one embedding per row for a list.
+        """
+        ENCODED_TEXTS.inc(1 if isinstance(sentences, str) else len(sentences), backend=self.name)
+        with ENCODE_SECONDS.time(backend=self.name):
+            return self.model.encode(sentences, batch_size=batch_size)
+
+
+class QuantizedTorchEncoder(TorchEncoder):
+    """
+    The PyTorch model with its linear layers dynamically quantized to int8.
+
+    Weights take a quarter of the memory and the matrix multiplications, which
+    dominate a transformer's CPU time, run on int8 kernels. Activations are quantized
+    on the fly, so no calibration data is needed.
+    """
+
+    name = 'torch-int8'
+
+    def __init__(self, model_name):
+        super().__init__(model_name)
+        import torch  # type: ignore
+        torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class OnnxEncoder:
+    """
+    The model exported to ONNX and run on ONNX Runtime, optionally with int8 weights.
+
+    The export happens once, with torch, into `directory` (see `export_onnx`); after
+    that the encoder only needs onnxruntime and the tokenizer, so processes using it
+    never import torch. Pooling and normalisation are replayed from the sentence
+    transformer's configuration so the embeddings match the reference backend.
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model_name, directory, quantize=False):
+        import onnxruntime  # type: ignore
+        from transformers import AutoTokenizer  # type: ignore
+        if not os.path.exists(os.path.join(directory, 'model.onnx')):
+            export_onnx(model_name, directory)
+        model_path = os.path.join(directory, 'model.onnx')
+        if quantize:
+            model_path = quantize_onnx(directory)
+            self.name = 'onnx-int8'
+
+        with open(os.path.join(directory, 'encoder.json')) as f:
+            settings = json.load(f)
+        self.max_seq_length = settings['max_seq_length']
+        self.pooling = settings['pooling']
+        self.normalize = settings['normalize']
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self._inputs = {node.name for node in self.session.get_inputs()}
+
+    def encode(self, sentences, batch_size=32):
+        """
+        Encodes text into embeddings.
+
+        Args:
+            sentences (str or list): One text or a list of texts.
+            batch_size (int): The number of texts per forward pass.
+
+        Returns:
+            numpy.ndarray: One embedding, or one embedding per row for a list.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        ENCODED_TEXTS.inc(len(texts), backend=self.name)
+        with ENCODE_SECONDS.time(backend=self.name):
+            return self._encode(texts, single, max(1, batch_size))
+
+    def _encode(self, texts, single, batch_size):
+        # Like sentence-transformers, batch texts of similar length to limit padding
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        embeddings = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            vectors = self._encode_batch([texts[i] for i in batch])
+            if embeddings.shape[1] == 0:
+                embeddings = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            embeddings[batch] = vectors
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length,
+                                return_tensors='np')
+        feed = {name: tokens[name].astype(np.int64) for name in self._inputs if name in tokens}
+        hidden = self.session.run(None, feed)[0]
+        mask = tokens['attention_mask'][..., None].astype(np.float32)
+        if self.pooling == 'cls':
+            vectors = hidden[:, 0]
+        elif self.pooling == 'max':
+            vectors = np.where(mask > 0, hidden, -1e9).max(axis=1)
+        else:
+            vectors = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32)
+
+
+def export_onnx(model_name, directory):
+    """
+    Exports the transformer of a sentence transformer model to ONNX, along with its
+    tokenizer and the pooling settings needed to rebuild sentence embeddings.
+
+    Args:
+        model_name (str): The sentence-transformers model name.
+        directory (str): Where to write model.onnx, the tokenizer files and encoder.json.
+    """
+    import torch  # type: ignore
+    from sentence_transformers import SentenceTransformer  # type: ignore
+    start = time.perf_counter()
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer, pooling = model[0], model[1]
+    modes = pooling.get_config_dict()
+    settings = {
+        'model_name': model_name,
+        'max_seq_length': model.max_seq_length,
+        'pooling': ('cls' if modes.get('pooling_mode_cls_token')
+                    else 'max' if modes.get('pooling_mode_max_tokens') else 'mean'),
+        'normalize': any(type(module).__name__ == 'Normalize' for module in model)
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    transformer.tokenizer.save_pretrained(directory)
+    auto_model = transformer.auto_model.eval()
+    sample = transformer.tokenizer(['an example sentence'], return_tensors='pt')
+    names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model, tuple(sample[name] for name in names), os.path.join(directory, 'model.onnx'),
+            input_names=names, output_names=['last_hidden_state'], dynamic_axes=dynamic_axes,
+            opset_version=14, do_constant_folding=True
+        )
+    with open(os.path.join(directory, 'encoder.json'), 'w') as f:
+        json.dump(settings, f, indent=2)
+    logging.info(f"Exported {model_name} to ONNX in {time.perf_counter() - start:.2f}s")
+
+
+def quantize_onnx(directory):
+    """
+    Writes an int8 copy of the exported model, if there isn't one already.
+
+    Args:
+        directory (str): The export directory.
+
+    Returns:
+        str: The path of the quantized model.
+    """
+    path = os.path.join(directory, 'model.int8.onnx')
+    if not os.path.exists(path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType  # type: ignore
+        quantize_dynamic(os.path.join(directory, 'model.onnx'), path, weight_type=QuantType.QInt8)
+    return path
+
+
+def create_encoder(backend, model_name, onnx_dir):
+    """
+    Loads the similarity model on the given backend.
+
+    Falls back to the float32 torch model, with a warning, when the backend's optional
+    dependencies (onnxruntime) are not installed.
+
+    Args:
+        backend (str): One of BACKENDS.
+        model_name (str): The sentence-transformers model name.
+        onnx_dir (str): The directory of the ONNX export, created on first use.
+
+    Returns:
+        TorchEncoder, QuantizedTorchEncoder or OnnxEncoder: The encoder.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    start = time.perf_counter()
+    try:
+        if backend == 'torch-int8':
+            encoder = QuantizedTorchEncoder(model_name)
+        elif backend in ('onnx', 'onnx-int8'):
+            encoder = OnnxEncoder(model_name, onnx_dir, quantize=backend == 'onnx-int8')
+        else:
+            encoder = TorchEncoder(model_name)
+    except ImportError as e:
+        logging.warning(f"Encoder backend {backend} is unavailable ({e}), using torch")
+        encoder = TorchEncoder(model_name)
+    logging.info(f"Loaded {model_name} ({encoder.name}) in {time.perf_counter() - start:.2f}s")
+    return encoder
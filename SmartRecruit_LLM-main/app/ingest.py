@@ -0,0 +1,326 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+
+from .metrics import PDF_PARSE_SECONDS
+
+# Pages of one document are joined with form feeds, which chunking treats as page breaks
+PAGE_SEPARATOR = '\f'
+
+
+class IngestError(Exception):
+    """
+    Raised when a CV can't be ingested: too many pages, too slow to parse, or unreadable.
+    """
+
+
+def page_count(path):
+    """
+    Counts the pages of a PDF without extracting any text. Runs in the ingestion
+    worker processes, under the document's parsing deadline.
+
+    Args:
+        path (str): The path of the PDF file.
+
+    Returns:
+        int: The number of pages.
+    """
+    import pdfplumber  # type: ignore
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(path, start, stop):
+    """
+    Extracts the text of a range of pages. Runs in the ingestion worker processes.
+
+    Args:
+        path (str): The path of the PDF file.
+        start (int): The first page, 0-based.
+        stop (int): The page after the last one.
+
+    Returns:
+        list: The text of each page, '' for pages without text.
+    """
+    import pdfplumber  # type: ignore
+    with pdfplumber.open(path) as pdf:
+        return [pdf.pages[number].extract_text() or '' for number in range(start, stop)]
+
+
+class CvIngestor:
+    """
+    Parses CV PDFs on a pool of worker processes.
+
+    Pages are parsed in ranges of INGEST_PAGES_PER_TASK in parallel and yielded in
+    order as soon as they are ready, so callers can start embedding the first pages
+    while the rest are still being parsed. Documents over INGEST_MAX_PAGES pages or
+    INGEST_TIMEOUT_SECONDS of parsing are rejected. Extracted text is cached on disk
+    by file hash, so re-uploads and bulk re-imports of the same file are free.
+
+    A document that times out leaves its pool: new documents go to a fresh pool, and
+    the old pool's processes are terminated once the other documents still on it are
+    done, so a hung parser neither keeps running nor fails other uploads.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 2
+        self.max_pages = 20
+        self.timeout = 30
+        self.pages_per_task = 2
+        self.cache_dir = None
+        self._pool = None
+        self._pid = None
+        # The futures not yet done on each pool, and the pools left after a timeout
+        self._outstanding = {}
+        self._retiring = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the ingestor from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.workers = app.config['INGEST_WORKERS']
+        self.max_pages = app.config['INGEST_MAX_PAGES']
+        self.timeout = app.config['INGEST_TIMEOUT_SECONDS']
+        self.pages_per_task = app.config['INGEST_PAGES_PER_TASK']
+        self.cache_dir = app.config['INGEST_CACHE_DIR']
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _ensure_pool(self):
+        # Children are started by a clean server process rather than forked from a
+        # worker that already runs threads and may hold the model
+        with self._lock:
+            # A pool whose child died (e.g. killed for memory on a huge PDF) can't take new work
+            if self._pool is None or self._pid != os.getpid() or getattr(self._pool, '_broken', False):
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                if self._pid != os.getpid():
+                    self._outstanding, self._retiring = {}, set()
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pid = os.getpid()
+            return self._pool
+
+    def _stop_stuck_workers(self, stuck):
+        """
+        Retires the pool running the futures of a document that timed out, and
+        terminates its processes once the other documents on it are done.
+
+        Args:
+            stuck (list): The futures of the document that timed out.
+        """
+        for future in stuck:
+            future.cancel()
+        with self._lock:
+            pool = next((pool for pool, futures in self._outstanding.items()
+                         if any(future in futures for future in stuck)), None)
+            if pool is None or pool in self._retiring:
+                # Finished after all, or already being retired by an earlier timeout
+                return
+            self._retiring.add(pool)
+            if pool is self._pool:
+                self._pool = None
+            others = [future for future in self._outstanding[pool] if future not in stuck]
+        threading.Thread(target=self._reap, args=(pool, others), name='ingest-reaper', daemon=True).start()
+
+    def _reap(self, pool, others):
+        # Every other document on the pool reaches its own deadline within one timeout
+        wait(others, timeout=self.timeout)
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._outstanding.pop(pool, None)
+            self._retiring.discard(pool)
+        logging.warning(f"Terminated {len(processes)} CV parsing process(es) after a parsing timeout")
+
+    def _cache_path(self, file_hash):
+        return os.path.join(self.cache_dir, f"{file_hash}.txt")
+
+    def cached_text(self, file_hash):
+        """
+        Looks up the extracted text of a file.
+
+        Args:
+            file_hash (str): The SHA-256 of the file.
+
+        Returns:
+            str: The text with pages separated by form feeds, or None if not cached.
+        """
+        try:
+            with open(self._cache_path(file_hash), encoding='utf-8') as f:
+                return f.read()
+        except (FileNotFoundError, TypeError):
+            return None
+
+    def _store_text(self, file_hash, text):
+        tmp_path = f"{self._cache_path(file_hash)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self._cache_path(file_hash))
+        except OSError as e:
+            logging.error(f"Failed to cache CV text {file_hash}: {e}")
+
+    def _submit_count(self, path):
+        pool = self._ensure_pool()
+        return self._track(pool, [pool.submit(page_count, path)])[0]
+
+    def _submit(self, path, count):
+        pool = self._ensure_pool()
+        return self._track(pool, [pool.submit(extract_pages, path, start, min(start + self.pages_per_task, count))
+                                  for start in range(0, count, self.pages_per_task)])
+
+    def _track(self, pool, futures):
+        with self._lock:
+            outstanding = self._outstanding.setdefault(pool, set())
+            outstanding.update(futures)
+        for future in futures:
+            future.add_done_callback(lambda done: self._forget(outstanding, done))
+        return futures
+
+    def _forget(self, outstanding, future):
+        with self._lock:
+            outstanding.discard(future)
+
+    def _result(self, future, document_futures, deadline):
+        """
+        Waits for one parsing task of a document until the document's deadline.
+
+        Args:
+            future (Future): The task.
+            document_futures (list): All the tasks of the document, stopped on a timeout.
+            deadline (float): The `time.monotonic()` by which the whole document must be parsed.
+
+        Returns:
+            The result of the task.
+
+        Raises:
+            IngestError: If the deadline passes or the task failed.
+        """
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            self._stop_stuck_workers(document_futures)
+            raise IngestError(f"Parsing the CV took longer than {self.timeout} seconds.")
+        except Exception as e:
+            raise IngestError(f"Could not read the PDF: {e}")
+
+    def _check_page_count(self, future, deadline):
+        count = self._result(future, [future], deadline)
+        if count > self.max_pages:
+            raise IngestError(f"The CV has {count} pages; at most {self.max_pages} are accepted.")
+        return count
+
+    def iter_pages(self, path, file_hash=None):
+        """
+        Yields the text of each page of a PDF, in order, as soon as it is parsed.
+
+        Args:
+            path (str): The path of the PDF file.
+            file_hash (str): The SHA-256 of the file, to use the text cache.
+
+        Yields:
+            str: The text of the next page.
+
+        Raises:
+            IngestError: If the PDF is too long, too slow to parse, or unreadable.
+        """
+        with PDF_PARSE_SECONDS.time(source='cache'):
+            cached = self.cached_text(file_hash) if file_hash else None
+        if cached is not None:
+            yield from cached.split(PAGE_SEPARATOR)
+            return
+
+        # One deadline for the whole document, page counting included
+        deadline = time.monotonic() + self.timeout
+        count = self._check_page_count(self._submit_count(path), deadline)
+        futures = self._submit(path, count)
+        pages = []
+        waited = 0.0
+        # Only the time spent waiting for the parser counts, not the caller's work between pages
+        wait_start = time.perf_counter()
+        try:
+            for future in futures:
+                batch = self._result(future, futures, deadline)
+                waited += time.perf_counter() - wait_start
+                pages.extend(batch)
+                yield from batch
+                wait_start = time.perf_counter()
+        finally:
+            for future in futures:
+                future.cancel()
+        PDF_PARSE_SECONDS.observe(waited, source='parse')
+
+        if file_hash:
+            self._store_text(file_hash, PAGE_SEPARATOR.join(pages))
+
+    def extract_text(self, path, file_hash=None):
+        """
+        Extracts the text of a PDF.
+
+        Args:
+            path (str): The path of the PDF file.
+            file_hash (str): The SHA-256 of the file, to use the text cache.
+
+        Returns:
+            str: The text of all pages, separated by form feeds.
+        """
+        return PAGE_SEPARATOR.join(self.iter_pages(path, file_hash))
+
+    def ingest_many(self, paths, file_hashes):
+        """
+        Extracts the text of many PDFs, with the pages of all files parsed in parallel.
+
+        Args:
+            paths (list): The paths of the PDF files.
+            file_hashes (list): The SHA-256 of each file.
+
+        Yields:
+            tuple: (path, text, page count, error) for each file, in input order. The text
+            is None and error is set when the file could not be ingested.
+        """
+        # Count the pages of every file in the pool first, then queue the pages of every
+        # file, so all of them are parsed in parallel
+        counting = []
+        for path, file_hash in zip(paths, file_hashes):
+            cached = self.cached_text(file_hash)
+            counting.append((path, file_hash, cached, self._submit_count(path) if cached is None else None))
+
+        pending = []
+        for path, file_hash, text, count_future in counting:
+            futures, error = None, None
+            if count_future is not None:
+                try:
+                    futures = self._submit(path, self._check_page_count(
+                        count_future, time.monotonic() + self.timeout))
+                except IngestError as e:
+                    error = e
+            pending.append((path, file_hash, text, futures, error))
+
+        for path, file_hash, text, futures, error in pending:
+            if futures is not None:
+                # One deadline for all the pages of a document, starting when its turn comes,
+                # so files queued behind others in a large import don't share one budget
+                deadline = time.monotonic() + self.timeout
+                try:
+                    with PDF_PARSE_SECONDS.time(source='parse'):
+                        pages = [page for future in futures for page in self._result(future, futures, deadline)]
+                    text = PAGE_SEPARATOR.join(pages)
+                    self._store_text(file_hash, text)
+                except IngestError as e:
+                    error = e
+            pages = text.count(PAGE_SEPARATOR) + 1 if text is not None else 0
+            yield path, text, pages, error
+
+
+cv_ingestor = CvIngestor()
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """
+    Key-value store in a local SQLite file, exposing the subset of the Redis client
+    interface used by InterviewStore (get, set with `ex`, delete).
+
+    The database runs in WAL mode so all worker processes of a node can share the
+    file. Expired keys are ignored on read and purged in bulk every `gc_interval`
+    seconds by whichever process writes next.
+    """
+
+    def __init__(self, path, gc_interval=300):
+        self.path = path
+        self.gc_interval = gc_interval
+        self._local = threading.local()
+        self._last_gc = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_kv_expires_at ON kv (expires_at)')
+
+    def _connection(self):
+        # sqlite3 connections can't be shared across threads or forked processes
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)', (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ex=None):
+        expires_at = time.time() + ex if ex else None
+        with self._connection() as connection:
+            connection.execute('INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)',
+                               (key, value, expires_at))
+        self._maybe_gc()
+        return True
+
+    def delete(self, *keys):
+        with self._connection() as connection:
+            return connection.executemany('DELETE FROM kv WHERE key = ?', [(key,) for key in keys]).rowcount
+
+    def purge_expired(self):
+        """
+        Deletes every expired key.
+
+        Returns:
+            int: The number of deleted keys.
+        """
+        self._last_gc = time.monotonic()
+        with self._connection() as connection:
+            return connection.execute('DELETE FROM kv WHERE expires_at <= ?', (time.time(),)).rowcount
+
+    def _maybe_gc(self):
+        if time.monotonic() - self._last_gc >= self.gc_interval:
+            self.purge_expired()
+
+
+def create_backend(url, gc_interval=300):
+    """
+    Opens the key-value backend for a store URL.
+
+    Args:
+        url (str): 'sqlite:///path/to/file.db' or a 'redis://' / 'rediss://' URL.
+        gc_interval (float): Seconds between purges of expired keys, for backends without native expiry.
+
+    Returns:
+        SQLiteStore or redis.Redis: The backend.
+    """
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis  # type: ignore
+        return redis.Redis.from_url(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteStore(url[len('sqlite:///'):], gc_interval)
+    raise ValueError(f"Unsupported interview store URL: {url}")
+
+
+class InterviewStore:
+    """
+    Server-side state of in-progress interviews.
+
+    The Flask session only carries the interview id; the questions, the answers given
+    so far and the pending task ids (question generation, the scoring of each answer
+    and the final submission) live in one compact JSON record per interview, so
+    any app node with access to the backend can serve the next request. Records
+    expire INTERVIEW_TTL_SECONDS after the last write.
+    """
+
+    key_prefix = 'interview:'
+
+    def __init__(self, app=None):
+        self.ttl = 7200
+        self._backend = None
+        self._url = None
+        self._gc_interval = 300
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the store from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.ttl = app.config['INTERVIEW_TTL_SECONDS']
+        self._url = app.config['INTERVIEW_STORE_URL']
+        self._gc_interval = app.config['INTERVIEW_GC_SECONDS']
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_backend(self._url, self._gc_interval)
+        return self._backend
+
+    def create(self, user_id, job_id, similarity_score, questions_task):
+        """
+        Starts a new interview.
+
+        Args:
+            user_id (int): The candidate.
+            job_id (int): The job applied to.
+            similarity_score (float): The CV/job similarity of the application.
+            questions_task (str): The id of the question generation task.
+
+        Returns:
+            dict: The new interview record, including its `id`.
+        """
+        interview = {
+            'id': uuid.uuid4().hex,
+            'user_id': user_id,
+            'job_id': job_id,
+            'similarity_score': similarity_score,
+            'questions_task': questions_task,
+            'feedback_task': None,
+            'answer_tasks': {},
+            'questions': None,
+            'current_question': 0,
+            'responses': {}
+        }
+        self.save(interview)
+        return interview
+
+    def get(self, interview_id, user_id):
+        """
+        Loads an interview of a user.
+
+        Args:
+            interview_id (str): The interview id, or None.
+            user_id (int): The user who must own the interview.
+
+        Returns:
+            dict: The interview record, or None if it is unknown, expired or owned by someone else.
+        """
+        if not interview_id:
+            return None
+        data = self.backend.get(self.key_prefix + interview_id)
+        if data is None:
+            return None
+        interview = json.loads(data)
+        return interview if interview['user_id'] == user_id else None
+
+    def save(self, interview):
+        """
+        Writes an interview record and restarts its time-to-live.
+
+        Args:
+            interview (dict): The interview record.
+        """
+        data = json.dumps(interview, separators=(',', ':'))
+        self.backend.set(self.key_prefix + interview['id'], data, ex=int(self.ttl))
+
+    def delete(self, interview_id):
+        """
+        Drops a finished interview.
+
+        Args:
+            interview_id (str): The interview id.
+        """
+        if interview_id:
+            self.backend.delete(self.key_prefix + interview_id)
+
+
+interview_store = InterviewStore()
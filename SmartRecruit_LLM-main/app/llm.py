@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limit import RateLimiter
+from .metrics import LLM_ATTEMPT_SECONDS, LLM_RETRIES, LLM_TOKENS
+
+# Responses worth retrying: rate limiting and the inference API's model-loading/overload errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """
+    Raised when the inference API could not produce a completion within the retry budget.
+    """
+
+
+class LLMUsage:
+    """
+    Accumulates the calls, tokens and wall time spent on one unit of work, such as
+    scoring one application. Token counts are estimated from the text length, since
+    the inference API does not report prompt tokens.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, prompt, completion, seconds):
+        """
+        Adds one successful call.
+
+        Args:
+            prompt (str): The prompt sent.
+            completion (str): The generated text, without the echoed prompt.
+            seconds (float): The time spent on the call, retries included.
+        """
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += estimate_tokens(prompt)
+            self.completion_tokens += estimate_tokens(completion)
+            self.seconds += seconds
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: The call count, estimated prompt and completion tokens, and seconds spent.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'seconds': round(self.seconds, 3)
+            }
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens of a text with the usual ~4 characters per token.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return (len(text) + 3) // 4
+
+
+class LLMClient:
+    """
+    Client for the text-generation inference API shared by all LLM calls of a worker.
+
+    Requests go through one pooled keep-alive session, so connections to API_URL are
+    reused instead of paying TCP and TLS setup per call. Failed attempts are retried
+    with jittered exponential backoff until LLM_MAX_RETRIES or the LLM_DEADLINE_SECONDS
+    budget runs out, and every attempt is paced by the shared rate limiter.
+    """
+
+    def __init__(self, app=None):
+        self.api_url = None
+        self.api_token = None
+        self.timeout = (5, 60)
+        self.max_retries = 5
+        self.deadline = 120
+        self.backoff_base = 1.0
+        self.backoff_cap = 30.0
+        self.pool_size = 10
+        self.rate_limiter = RateLimiter()
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the client from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.api_url = app.config['API_URL']
+        self.api_token = app.config['API_TOKEN']
+        self.timeout = (app.config['LLM_CONNECT_TIMEOUT'], app.config['LLM_READ_TIMEOUT'])
+        self.max_retries = app.config['LLM_MAX_RETRIES']
+        self.deadline = app.config['LLM_DEADLINE_SECONDS']
+        self.backoff_base = app.config['LLM_BACKOFF_BASE']
+        self.backoff_cap = app.config['LLM_BACKOFF_CAP']
+        self.pool_size = app.config['LLM_POOL_SIZE']
+        self.rate_limiter.init_app(app)
+        self._session = None
+
+    @property
+    def session(self):
+        # Sockets must not be shared with a forked parent, so each process gets its own pool
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({
+                    "Authorization": f"Bearer {self.api_token}",
+                    "Content-Type": "application/json"
+                })
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def generate(self, prompt, parameters, usage=None):
+        """
+        Sends a prompt to the inference API and returns the generated text.
+
+        Args:
+            prompt (str): The prompt to complete.
+            parameters (dict): The generation parameters, e.g. max_new_tokens and temperature.
+            usage (LLMUsage): Accumulator the successful call is recorded in.
+
+        Returns:
+            str: The generated text.
+
+        Raises:
+            LLMError: If no attempt succeeded within the retry budget.
+        """
+        payload = {"inputs": prompt, "parameters": parameters}
+        start = time.monotonic()
+        last_error = None
+
+        for attempt in range(self.max_retries):
+            self.rate_limiter.acquire()
+            attempt_start = time.monotonic()
+            retry_after = None
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    retry_after = _retry_after(response)
+                    raise requests.exceptions.HTTPError(f"{response.status_code} from inference API", response=response)
+                response.raise_for_status()
+                result = response.json()
+                self._record(time.monotonic() - attempt_start, failed=False, mode='generate')
+                generated_text = result[0].get('generated_text', '')
+                completion = generated_text[len(prompt):] if generated_text.startswith(prompt) else generated_text
+                _count_tokens(prompt, completion)
+                if usage is not None:
+                    usage.record(prompt, completion, time.monotonic() - start)
+                return generated_text
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+                self._record(time.monotonic() - attempt_start, failed=True, mode='generate')
+                last_error = e
+                if e.response is not None and e.response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+            except (ValueError, KeyError, IndexError, AttributeError) as e:
+                # Malformed response body; retrying will not help
+                self._record(time.monotonic() - attempt_start, failed=True, mode='generate')
+                last_error = e
+                break
+
+            if not self._backoff(attempt, retry_after, start, last_error, mode='generate'):
+                break
+
+        raise LLMError(f"Inference API call failed: {last_error}")
+
+    def stream(self, prompt, parameters):
+        """
+        Sends a prompt to the inference API and yields the generated text as it arrives.
+
+        Asks for server-sent events, the format of the text-generation-inference
+        streaming API. A backend that answers with a plain JSON body instead is handled
+        by yielding its whole completion, without the echoed prompt, as one chunk.
+        Failed attempts are retried until the first chunk has been received; an error
+        after that raises LLMError, since the caller has already consumed part of the text.
+
+        Args:
+            prompt (str): The prompt to complete.
+            parameters (dict): The generation parameters, e.g. max_new_tokens and temperature.
+
+        Yields:
+            str: The next chunk of generated text.
+
+        Raises:
+            LLMError: If no attempt succeeded within the retry budget, or the stream broke off.
+        """
+        payload = {"inputs": prompt, "parameters": parameters, "stream": True}
+        start = time.monotonic()
+        last_error = None
+
+        for attempt in range(self.max_retries):
+            self.rate_limiter.acquire()
+            attempt_start = time.monotonic()
+            retry_after = None
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=True)
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    retry_after = _retry_after(response)
+                    raise requests.exceptions.HTTPError(f"{response.status_code} from inference API", response=response)
+                response.raise_for_status()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+                self._record(time.monotonic() - attempt_start, failed=True, mode='stream')
+                last_error = e
+                if e.response is not None and e.response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+                if not self._backoff(attempt, retry_after, start, last_error, mode='stream'):
+                    break
+                continue
+
+            with response:
+                if not response.headers.get('Content-Type', '').startswith('text/event-stream'):
+                    try:
+                        generated_text = response.json()[0].get('generated_text', '')
+                    except (ValueError, KeyError, IndexError, AttributeError) as e:
+                        self._record(time.monotonic() - attempt_start, failed=True, mode='stream')
+                        raise LLMError(f"Inference API call failed: {e}")
+                    self._record(time.monotonic() - attempt_start, failed=False, mode='stream')
+                    completion = generated_text[len(prompt):] if generated_text.startswith(prompt) else generated_text
+                    _count_tokens(prompt, completion)
+                    yield completion
+                    return
+
+                received = []
+                try:
+                    for chunk in _server_sent_tokens(response):
+                        received.append(chunk)
+                        yield chunk
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    self._record(time.monotonic() - attempt_start, failed=True, mode='stream')
+                    raise LLMError(f"Inference API stream broke off: {e}")
+                self._record(time.monotonic() - attempt_start, failed=False, mode='stream')
+                _count_tokens(prompt, ''.join(received))
+                return
+
+        raise LLMError(f"Inference API call failed: {last_error}")
+
+    def _backoff(self, attempt, retry_after, start, last_error, mode):
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        wait_time = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            wait_time = max(wait_time, min(retry_after, self.backoff_cap))
+        if attempt + 1 >= self.max_retries or time.monotonic() - start + wait_time > self.deadline:
+            return False
+        logging.warning(f"LLM attempt {attempt + 1} failed. Retrying in {wait_time:.2f} seconds... Error: {last_error}")
+        self.retries += 1
+        LLM_RETRIES.inc(mode=mode)
+        time.sleep(wait_time)
+        return True
+
+    def _record(self, latency, failed, mode):
+        LLM_ATTEMPT_SECONDS.observe(latency, mode=mode, outcome='error' if failed else 'ok')
+        with self._lock:
+            self.calls += 1
+            self.failures += int(failed)
+            self._latencies.append(latency)
+
+    def stats(self):
+        """
+        Summarises the latency of recent API attempts in this process.
+
+        Returns:
+            dict: Call, failure and retry counts and p50/p95/max latency in seconds.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {'calls': self.calls, 'failures': self.failures, 'retries': self.retries}
+        if latencies:
+            stats.update({
+                'p50': latencies[len(latencies) // 2],
+                'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'max': latencies[-1]
+            })
+        return stats
+
+
+def _count_tokens(prompt, completion):
+    LLM_TOKENS.inc(estimate_tokens(prompt), type='prompt')
+    LLM_TOKENS.inc(estimate_tokens(completion), type='completion')
+
+
+def _server_sent_tokens(response):
+    # text-generation-inference sends one 'data:{"token": {"text": ..., "special": ...}, ...}' event per token
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        event = json.loads(line[len('data:'):])
+        if 'error' in event:
+            raise ValueError(event['error'])
+        token = event.get('token') or {}
+        if not token.get('special'):
+            yield token.get('text', '')
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,259 @@
+import os
+import hmac
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from a cached SQL query to an LLM call with retries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Metric:
+    """
+    A metric family: one value per combination of label values.
+
+    Updates take a single lock held for a dict lookup and an addition, so metrics
+    can be recorded on the hot path of every request.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+    def expose(self):
+        """
+        Returns:
+            list: The lines of the metric family in the Prometheus text format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._sample_lines(key, value))
+        return lines
+
+
+class Counter(Metric):
+    """
+    A value that only goes up, e.g. a number of retries or tokens.
+    """
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _sample_lines(self, key, value):
+        return [f"{self.name}{self._format_labels(key)} {value}"]
+
+
+class Histogram(Metric):
+    """
+    The distribution of durations, in cumulative buckets plus their sum and count.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # One count per bucket, then +Inf, the sum and the total count
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Times the enclosed block, including when it raises.
+
+        Args:
+            **labels: The label values of the observation.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _sample_lines(self, key, counts):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {counts[-2]}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    """
+    The metrics of this process, exposed on /metrics.
+
+    Metrics are kept per process: with several gunicorn workers each scrape reports
+    the worker that served it, identified by the `pid` label of
+    process_start_time_seconds. Counters restart with the worker, which Prometheus'
+    rate() handles as a counter reset.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.started_at = time.time()
+
+    def counter(self, name, documentation, labels=()):
+        metric = Counter(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        lines = [
+            "# HELP process_start_time_seconds Start time of the process since the epoch.",
+            "# TYPE process_start_time_seconds gauge",
+            f'process_start_time_seconds{{pid="{os.getpid()}"}} {self.started_at}',
+        ]
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Latency of HTTP requests by route.', ('method', 'route', 'status'))
+PDF_PARSE_SECONDS = registry.histogram(
+    'pdf_parse_duration_seconds', 'Time to extract the text of a CV, by whether it came from the text cache.', ('source',))
+ENCODE_SECONDS = registry.histogram(
+    'encode_duration_seconds', 'Time of one encode call of the similarity model.', ('backend',))
+ENCODED_TEXTS = registry.counter(
+    'encoded_texts_total', 'Texts encoded by the similarity model.', ('backend',))
+LLM_ATTEMPT_SECONDS = registry.histogram(
+    'llm_attempt_duration_seconds', 'Latency of each inference API attempt.', ('mode', 'outcome'))
+LLM_RETRIES = registry.counter(
+    'llm_retries_total', 'Inference API attempts that were retried after a failure.', ('mode',))
+LLM_TOKENS = registry.counter(
+    'llm_tokens_total', 'Estimated prompt and completion tokens of successful inference API calls.', ('type',))
+MONGO_COMMAND_SECONDS = registry.histogram(
+    'mongo_command_duration_seconds', 'Latency of MongoDB commands.', ('command', 'outcome'))
+QUESTION_CACHE_LOOKUPS = registry.counter(
+    'question_cache_lookups_total', 'Lookups of generated interview question sets, by hit or miss.', ('result',))
+SQL_QUERY_SECONDS = registry.histogram(
+    'sql_query_duration_seconds', 'Latency of SQL statements.', ('statement',))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    SQL_QUERY_SECONDS.observe(elapsed, statement=(statement.split(None, 1) or [''])[0].upper())
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+
+class Metrics:
+    """
+    Records per-route request latency and SQL timings, and serves /metrics.
+    """
+
+    def __init__(self, app=None):
+        self.registry = registry
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Installs the request hooks and the /metrics endpoint if METRICS_ENABLED. The
+        endpoint requires METRICS_TOKEN; without one, metrics stay off.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        if not app.config['METRICS_ENABLED']:
+            return
+        token = app.config['METRICS_TOKEN']
+        if not token:
+            logging.error("METRICS_ENABLED is set without METRICS_TOKEN; not serving /metrics")
+            return
+        from flask import g, request, Response
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+
+        @app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def remember_status(response):
+            g.response_status = response.status_code
+            return response
+
+        # Teardown runs even when a view raises, which after_request doesn't
+        @app.teardown_request
+        def observe_request(exc):
+            started = g.pop('request_started', None)
+            status = g.pop('response_status', 500)
+            if started is not None:
+                # The URL rule, not the path, so that ids don't create a series per job
+                route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route,
+                                             status=500 if exc is not None else status)
+
+        def metrics_endpoint():
+            supplied = request.headers.get('Authorization', '').encode('utf-8')
+            if not hmac.compare_digest(supplied, f"Bearer {token}".encode('utf-8')):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+            return Response(self.registry.expose(), mimetype='text/plain; version=0.0.4')
+
+        app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
+
+
+metrics = Metrics()
@@ -11,6 +11,8 @@ class User(db.Model):
     birthday = db.Column(db.String(10), nullable=False)
     password = db.Column(db.String(60), nullable=False)
     cv_file = db.Column(db.String(120)) 
+    cv_hash = db.Column(db.String(64))
+    cv_text = db.Column(db.Text)
     profile_photo = db.Column(db.String(120)) 
 
 class Job(db.Model):
@@ -20,8 +22,15 @@ class Job(db.Model):
     description = db.Column(db.Text, nullable=False)
     salary = db.Column(db.String(50), nullable=False)  
     date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    # Keyset pagination of the public listing and of each recruiter's jobs
+    __table_args__ = (
+        db.Index('ix_job_date_posted_id', 'date_posted', 'id'),
+        db.Index('ix_job_user_id_date_posted_id', 'user_id', 'date_posted', 'id'),
+    )
+
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -34,3 +43,22 @@ class Application(db.Model):
     job = db.relationship('Job', backref=db.backref('applications', lazy=True))
 
     __table_args__ = (db.UniqueConstraint('user_id', 'job_id', name='unique_user_job_application'),)
+
+class ListingVersion(db.Model):
+    # A single row, bumped whenever a job is created, edited or deleted, so that every
+    # worker can tell whether its cached listing pages are current with one primary key lookup
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class Task(db.Model):
+    id = db.Column(db.String(36), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    payload = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
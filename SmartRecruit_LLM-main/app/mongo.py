@@ -0,0 +1,211 @@
+from pymongo import ASCENDING, IndexModel, ReplaceOne, UpdateOne, monitoring
+
+from .metrics import MONGO_COMMAND_SECONDS
+
+# Fields of an interview's feedback entries needed for scoring and the dashboard,
+# i.e. everything but the generated feedback text
+SCORE_FIELDS = ('question', 'response', 'score')
+
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    Records the latency of every MongoDB command in the metrics.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome='ok')
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome='error')
+
+
+def create_client(uri, timeout_ms=5000):
+    """
+    Connects to the MongoDB deployment of a URI.
+
+    Args:
+        uri (str): A 'mongodb://' or 'mongodb+srv://' URI, or 'mongomock://localhost/<database>'
+            for an in-memory stand-in (requires the `mongomock` package), e.g. in tests and
+            benchmarks that shouldn't need a server.
+        timeout_ms (int): How long an operation waits for a reachable server before failing.
+
+    Returns:
+        pymongo.MongoClient or mongomock.MongoClient: The client. Connections are opened lazily.
+    """
+    if uri.startswith('mongomock://'):
+        import mongomock  # type: ignore
+        return mongomock.MongoClient('mongodb://' + uri[len('mongomock://'):])
+    from pymongo import MongoClient
+    return MongoClient(uri, serverSelectionTimeoutMS=timeout_ms, event_listeners=[CommandTimer()])
+
+
+class MongoRepository:
+    """
+    Access to the interview documents and the per-job dashboard aggregates.
+
+    The queries below rely on the indexes of `create_indexes`, which `flask
+    create-mongo-indexes` creates at deploy time. Reads use projections so that lookups
+    which only need scores or existence don't transfer every question, response and
+    feedback text of an interview.
+    """
+
+    def __init__(self, app=None):
+        self.client = None
+        self.database = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Creates the client of MONGO_URI. No connection is made until the first query,
+        so starting the app never waits on MongoDB.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.client = create_client(app.config['MONGO_URI'], app.config['MONGO_TIMEOUT_MS'])
+        self.database = self.client.get_default_database('applications')
+
+    @property
+    def applications(self):
+        return self.database['applications']
+
+    @property
+    def analytics(self):
+        return self.database['job_analytics']
+
+    def create_indexes(self):
+        """
+        Creates the indexes of both collections. Existing indexes are left as they are.
+        """
+        self.applications.create_indexes([
+            IndexModel([('application_id', ASCENDING)], name='application_id', unique=True),
+            IndexModel([('user_id', ASCENDING), ('job_id', ASCENDING)], name='user_id_job_id'),
+            IndexModel([('job_id', ASCENDING)], name='job_id'),
+        ])
+        self.analytics.create_indexes([
+            IndexModel([('job_id', ASCENDING)], name='job_id', unique=True),
+        ])
+
+    def save_application(self, document):
+        """
+        Stores the interview document of an application, replacing the one a previous
+        run of the same submission may have written.
+
+        Args:
+            document (dict): The document, with string `application_id`, `user_id` and `job_id`.
+        """
+        self.applications.replace_one({'application_id': document['application_id']}, document, upsert=True)
+
+    def has_applied(self, user_id, job_id):
+        """
+        Checks whether a candidate already has an interview document for a job.
+
+        Args:
+            user_id (int): The candidate.
+            job_id (int): The job.
+
+        Returns:
+            bool: True if a document exists.
+        """
+        return self.applications.find_one({'user_id': str(user_id), 'job_id': str(job_id)}, {'_id': 1}) is not None
+
+    def get_feedback(self, application_id):
+        """
+        Loads the scored interview of an application.
+
+        Args:
+            application_id (int): The application.
+
+        Returns:
+            list: The feedback entries, or None if the application has no interview document.
+        """
+        document = self.applications.find_one({'application_id': str(application_id)}, {'feedback': 1, '_id': 0})
+        return None if document is None else document.get('feedback', [])
+
+    def get_scores(self, application_ids):
+        """
+        Loads the questions, responses and scores of many interviews in one query,
+        without the feedback texts.
+
+        Args:
+            application_ids (list): The applications.
+
+        Returns:
+            dict: The feedback entries by application id (as a string).
+        """
+        projection = dict({f"feedback.{field}": 1 for field in SCORE_FIELDS}, application_id=1, _id=0)
+        cursor = self.applications.find({'application_id': {'$in': [str(i) for i in application_ids]}}, projection)
+        return {document['application_id']: document.get('feedback', []) for document in cursor}
+
+    def get_responses(self, job_id, offset, limit):
+        """
+        Loads a page of all the interview responses to a job, best score first, in one
+        aggregation that also counts them.
+
+        Args:
+            job_id (int): The job.
+            offset (int): The number of responses to skip.
+            limit (int): The number of responses to return.
+
+        Returns:
+            tuple: (list of question/response/score dicts, total number of responses).
+        """
+        result = next(self.applications.aggregate([
+            {'$match': {'job_id': str(job_id)}},
+            {'$unwind': '$feedback'},
+            {'$sort': {'feedback.score': -1, 'application_id': 1}},
+            {'$facet': {
+                'total': [{'$count': 'count'}],
+                'page': [{'$skip': offset}, {'$limit': limit}, {'$project': {
+                    '_id': 0, 'question': '$feedback.question', 'response': '$feedback.response',
+                    'score': '$feedback.score'
+                }}]
+            }}
+        ]), None)
+        if result is None or not result['total']:
+            return [], 0
+        return result['page'], result['total'][0]['count']
+
+    def get_job_analytics(self, job_id):
+        """
+        Loads the aggregate of a job.
+
+        Args:
+            job_id (int): The job.
+
+        Returns:
+            dict: The aggregate document without its `_id`, or None if there is none yet.
+        """
+        return self.analytics.find_one({'job_id': str(job_id)}, {'_id': 0})
+
+    def replace_job_analytics(self, documents, only_missing=False):
+        """
+        Writes the aggregates of many jobs in one bulk write.
+
+        Args:
+            documents (list): The aggregate documents, each with its `job_id`.
+            only_missing (bool): Only insert aggregates of jobs that have none, so as not
+                to overwrite one another worker created in the meantime.
+        """
+        if not documents:
+            return
+        if only_missing:
+            requests = [UpdateOne({'job_id': document['job_id']},
+                                  {'$setOnInsert': {k: v for k, v in document.items() if k != 'job_id'}}, upsert=True)
+                        for document in documents]
+        else:
+            requests = [ReplaceOne({'job_id': document['job_id']}, document, upsert=True) for document in documents]
+        self.analytics.bulk_write(requests, ordered=False)
+
+    def delete_job_analytics(self, job_id):
+        """
+        Drops the aggregate of a job.
+
+        Args:
+            job_id (int): The job.
+        """
+        self.analytics.delete_one({'job_id': str(job_id)})
@@ -0,0 +1,149 @@
+import hashlib
+from datetime import datetime, timezone
+from flask import request, session, make_response
+from markdown import markdown
+
+from . import db
+from .cache import LRUCache
+from .config import Config
+from .models import ListingVersion
+
+# Rendered fragments: job descriptions keyed by ('job', job id, version) and listing
+# pages keyed by ('listing', user id, listing version, query arguments)
+fragment_cache = LRUCache(max_entries=Config.PAGE_CACHE_ENTRIES)
+
+
+def make_etag(*parts):
+    """
+    Builds an entity tag from everything a rendered page depends on.
+
+    Args:
+        *parts: Values identifying the page version, e.g. the job id and its edit time.
+
+    Returns:
+        str: The tag.
+    """
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def viewer_version(user):
+    """
+    Returns the parts of the signed-in user that every page renders (the navigation
+    bar photo) or that change its content (the CV behind recommendations).
+
+    Args:
+        user (User): The signed-in user.
+
+    Returns:
+        tuple: Values to include in entity tags.
+    """
+    return user.id, user.profile_photo, user.cv_hash
+
+
+def listing_version():
+    """
+    Returns a stamp that changes whenever a job is created, edited or deleted, read
+    from the database so that every worker process agrees on it.
+
+    Returns:
+        tuple: (time of the latest job change, version number), or (None, 0) before the first change.
+    """
+    row = ListingVersion.query.with_entities(ListingVersion.updated_at, ListingVersion.version) \
+        .filter_by(id=1).first()
+    return tuple(row) if row is not None else (None, 0)
+
+
+def bump_listing_version():
+    """
+    Marks every worker's cached listing pages as stale. Called after a job change is committed.
+    """
+    now = datetime.utcnow()
+    bumped = ListingVersion.query.filter_by(id=1) \
+        .update({'version': ListingVersion.version + 1, 'updated_at': now}, synchronize_session=False)
+    if not bumped:
+        db.session.add(ListingVersion(id=1, version=1, updated_at=now))
+    db.session.commit()
+
+
+def not_modified(etag, last_modified):
+    """
+    Answers a conditional GET without rendering when the client's copy is current.
+
+    Pages with pending flash messages are always rendered, since the cached copy
+    wouldn't show them.
+
+    Args:
+        etag (str): The entity tag of the current version.
+        last_modified (datetime.datetime): The naive UTC time of the last change.
+
+    Returns:
+        Response: An empty 304 response, or None if the page must be rendered.
+    """
+    if '_flashes' in session:
+        return None
+    if request.if_none_match:
+        current = etag in request.if_none_match
+    else:
+        # If-None-Match takes precedence; dates only have a one second resolution
+        since = request.if_modified_since
+        current = since is not None and last_modified is not None and _http_date(last_modified) <= since
+    if not current:
+        return None
+    return cacheable(make_response('', 304), etag, last_modified)
+
+
+def cacheable(response, etag, last_modified):
+    """
+    Adds the validators that let the browser revalidate the page instead of refetching it.
+
+    Args:
+        response (Response): The response.
+        etag (str): The entity tag of the page version.
+        last_modified (datetime.datetime): The naive UTC time of the last change.
+
+    Returns:
+        Response: The same response.
+    """
+    if '_flashes' in session:
+        return response
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    # The pages are per user: keep them out of shared caches and revalidate on every view
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def job_description_html(job):
+    """
+    Renders a job description from markdown, once per edit of the job.
+
+    Args:
+        job (Job): The job.
+
+    Returns:
+        str: The HTML of the description.
+    """
+    key = ('job', job.id, job.updated_at)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = markdown(job.description)
+        fragment_cache.set(key, html)
+    return html
+
+
+def invalidate_job(job_id):
+    """
+    Drops the cached fragments of a job and every cached listing page, here and, through
+    the listing version, in the other worker processes.
+
+    Args:
+        job_id (int): The created, edited or deleted job.
+    """
+    bump_listing_version()
+    fragment_cache.invalidate_where(lambda key: key[0] == 'listing' or (key[0] == 'job' and key[1] == job_id))
+
+
+def _http_date(value):
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
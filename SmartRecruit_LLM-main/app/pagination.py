@@ -0,0 +1,111 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+from .models import Job
+
+
+def encode_cursor(job):
+    """
+    Encodes the position of a job in the (date_posted, id) ordering as an opaque cursor.
+
+    Args:
+        job (Job): The job at the edge of a page.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    raw = f"{job.date_posted.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        tuple: The date_posted and id of the job, or None if the cursor is invalid.
+    """
+    try:
+        date_posted, job_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(date_posted), int(job_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def filter_jobs(query, keyword=None, location=None, salary=None):
+    """
+    Applies the job listing filters.
+
+    Args:
+        query (Query): The job query to filter.
+        keyword (str): Text the title must contain.
+        location (str): Text the location must contain.
+        salary (str): Text the salary must contain.
+
+    Returns:
+        Query: The filtered query.
+    """
+    if keyword:
+        query = query.filter(Job.title.ilike(f"%{keyword}%"))
+    if location:
+        query = query.filter(Job.location.ilike(f"%{location}%"))
+    if salary:
+        query = query.filter(Job.salary.contains(salary))
+    return query
+
+
+def paginate_jobs(query, per_page, after=None, before=None):
+    """
+    Keyset pagination over jobs, newest first.
+
+    Pages are addressed by the (date_posted, id) of their edge rows rather than by an
+    offset, so every page is an index range scan on ix_job_date_posted_id and costs
+    the same no matter how deep it is.
+
+    Args:
+        query (Query): The filtered job query.
+        per_page (int): The number of jobs per page.
+        after (str): Cursor of the last job of the previous page, to get the next page.
+        before (str): Cursor of the first job of the next page, to get the previous page.
+
+    Returns:
+        dict: The jobs of the page and the cursors of the neighbouring pages, if any.
+    """
+    position = decode_cursor(after or before) if (after or before) else None
+    newest_first = before is None or position is None
+
+    if position is not None:
+        date_posted, job_id = position
+        if newest_first:
+            query = query.filter(or_(Job.date_posted < date_posted,
+                                     and_(Job.date_posted == date_posted, Job.id < job_id)))
+        else:
+            query = query.filter(or_(Job.date_posted > date_posted,
+                                     and_(Job.date_posted == date_posted, Job.id > job_id)))
+
+    if newest_first:
+        query = query.order_by(Job.date_posted.desc(), Job.id.desc())
+    else:
+        query = query.order_by(Job.date_posted.asc(), Job.id.asc())
+
+    # Fetch one extra row to know whether there is another page in this direction
+    jobs = query.limit(per_page + 1).all()
+    has_more = len(jobs) > per_page
+    jobs = jobs[:per_page]
+    if not newest_first:
+        jobs.reverse()
+
+    if newest_first:
+        has_next, has_previous = has_more, position is not None
+    else:
+        has_next, has_previous = True, has_more
+
+    return {
+        'jobs': jobs,
+        'next_cursor': encode_cursor(jobs[-1]) if jobs and has_next else None,
+        'previous_cursor': encode_cursor(jobs[0]) if jobs and has_previous else None
+    }
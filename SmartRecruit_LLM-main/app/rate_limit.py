@@ -0,0 +1,52 @@
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by all threads of a worker process.
+
+    `rate` tokens are added per second up to `burst`; each call to `acquire` takes one
+    token and blocks until one is available. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate=0, burst=1, app=None):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the limiter from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.rate = app.config['LLM_RATE_LIMIT']
+        self.burst = app.config['LLM_RATE_BURST']
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until the bucket has refilled enough if it is empty.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is the caller's place in the queue
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
@@ -1,15 +1,19 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session, g, current_app, abort, jsonify
-from markdown import markdown
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, g, current_app, abort, jsonify, make_response
+from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
-from datetime import datetime
 import os
-import pdfplumber  # type: ignore
 import logging
-import time
+import json
 
-from . import db, applications_collection
+from . import db, mongo
 from .models import User, Job, Application
-from .utils import allowed_file, evaluate_cv, extract_score, generate_interview_questions, generate_feedback, convert_keys_to_strings
+from .tasks import task_queue
+from .interview_store import interview_store
+from .analytics import get_job_analytics, record_status_change, delete_job_analytics
+from .pagination import filter_jobs, paginate_jobs
+from .page_cache import fragment_cache, make_etag, viewer_version, listing_version, not_modified, cacheable, job_description_html, invalidate_job
+from .ingest import IngestError
+from .utils import allowed_file, evaluate_cv, cache_job_embedding, invalidate_job_embedding, extract_cv_text, file_hash, precompute_cv, job_index, job_search_index, recommend_jobs, screen_candidates, search_jobs
 
 main = Blueprint('main', __name__)
 
@@ -29,8 +33,86 @@ def inject_user():
 def home():
     if g.user is None:
         return redirect(url_for('main.auth'))
-    jobs = Job.query.filter(Job.user_id != g.user.id).all()
-    return render_template('snippet_career_list.html', jobs=jobs)
+
+    filters = {
+        'keyword': request.args.get('q', '').strip(),
+        'location': request.args.get('location', '').strip(),
+        'salary': request.args.get('salary', '').strip()
+    }
+    # Repeat views of an unchanged listing are answered without querying or rendering.
+    # Keyword rankings come from each worker's search index, which can lag the table
+    # by a refresh interval, so they are always rendered.
+    last_modified, version = listing_version()
+    arguments = tuple(sorted(request.args.items()))
+    etag = None
+    if not filters['keyword']:
+        etag = make_etag('listing', viewer_version(g.user), version, arguments)
+        unchanged = not_modified(etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+
+    fragment_key = ('listing', g.user.id, version, arguments)
+    jobs_html = fragment_cache.get(fragment_key) if etag else None
+    if jobs_html is None:
+        jobs_html = render_job_cards(filters)
+        if etag:
+            fragment_cache.set(fragment_key, jobs_html)
+
+    # Recommendations only make sense on the unfiltered first page
+    recommended_jobs = []
+    first_page = not (request.args.get('after') or request.args.get('before') or any(filters.values()))
+    if g.user.cv_text and first_page:
+        try:
+            recommended_jobs = recommend_jobs(g.user, current_app.config['RECOMMENDED_JOBS_COUNT'])
+        except Exception as e:
+            logging.error(f"Failed to recommend jobs: {e}")
+
+    response = make_response(render_template('snippet_career_list.html', jobs_html=jobs_html, filters=filters,
+                                             recommended_jobs=recommended_jobs))
+    return cacheable(response, etag, last_modified) if etag else response
+
+def render_job_cards(filters):
+    """
+    Renders the job cards and pagination links of a listing page.
+
+    Args:
+        filters (dict): The keyword, location and salary filters of the request.
+
+    Returns:
+        str: The HTML fragment.
+    """
+    per_page = current_app.config['JOBS_PER_PAGE']
+    link_args = {name: value for name, value in
+                 (('q', filters['keyword']), ('location', filters['location']), ('salary', filters['salary'])) if value}
+
+    if filters['keyword']:
+        # Keyword searches are ranked by relevance, so they page by position in the ranking
+        page_number = request.args.get('page', 1, type=int)
+        own_job_ids = {job_id for (job_id,) in Job.query.with_entities(Job.id).filter_by(user_id=g.user.id)}
+        ranking = search_jobs(filters['keyword'], current_app.config['SEARCH_MAX_RESULTS'], exclude=own_job_ids,
+                              hybrid_weight=current_app.config['SEARCH_HYBRID_WEIGHT'])
+        ranked_ids = [job_id for job_id, _ in ranking]
+        if filters['location'] or filters['salary']:
+            query = filter_jobs(Job.query.with_entities(Job.id).filter(Job.id.in_(ranked_ids)),
+                                location=filters['location'], salary=filters['salary'])
+            matching_ids = {job_id for (job_id,) in query}
+            ranked_ids = [job_id for job_id in ranked_ids if job_id in matching_ids]
+
+        page_ids = ranked_ids[(page_number - 1) * per_page:page_number * per_page]
+        jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_(page_ids))}
+        jobs = [jobs_by_id[job_id] for job_id in page_ids if job_id in jobs_by_id]
+        previous_url = url_for('main.home', page=page_number - 1, **link_args) if page_number > 1 else None
+        next_url = url_for('main.home', page=page_number + 1, **link_args) \
+            if page_number * per_page < len(ranked_ids) else None
+    else:
+        query = filter_jobs(Job.query.filter(Job.user_id != g.user.id), **filters)
+        page = paginate_jobs(query, per_page, after=request.args.get('after'), before=request.args.get('before'))
+        jobs = page['jobs']
+        previous_url = url_for('main.home', before=page['previous_cursor'], **link_args) \
+            if page['previous_cursor'] else None
+        next_url = url_for('main.home', after=page['next_cursor'], **link_args) if page['next_cursor'] else None
+
+    return render_template('snippet_job_cards.html', jobs=jobs, next_url=next_url, previous_url=previous_url)
 
 @main.route('/sign', methods=['GET', 'POST'])
 def auth():
@@ -93,6 +175,7 @@ def auth():
 
 @main.route('/logout')
 def logout():
+    interview_store.delete(session.get('interview_id'))
     session.clear()
     flash('You have been logged out.', 'success')
     return redirect(url_for('main.auth'))
@@ -118,6 +201,15 @@ def create_job():
         )
         db.session.add(new_job)
         db.session.commit()
+        invalidate_job(new_job.id)
+
+        try:
+            job_search_index.add(new_job)
+            cache_job_embedding(new_job.description)
+            job_index.add(new_job)
+        except Exception as e:
+            logging.error(f"Failed to precompute job embedding: {e}")
+
         flash('Job created successfully!', 'success')
         return redirect(url_for('main.my_jobs'))
 
@@ -129,8 +221,12 @@ def my_jobs():
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
-    jobs = Job.query.filter_by(user_id=g.user.id).all()
-    return render_template('my_jobs.html', jobs=jobs)
+    keyword = request.args.get('q', '').strip()
+    query = filter_jobs(Job.query.filter_by(user_id=g.user.id), keyword=keyword)
+    page = paginate_jobs(query, current_app.config['JOBS_PER_PAGE'],
+                         after=request.args.get('after'), before=request.args.get('before'))
+    return render_template('my_jobs.html', jobs=page['jobs'], next_cursor=page['next_cursor'],
+                           previous_cursor=page['previous_cursor'], keyword=keyword)
 
 @main.route('/edit_job/<int:job_id>', methods=['GET', 'POST'])
 def edit_job(job_id):
@@ -143,11 +239,21 @@ def edit_job(job_id):
         abort(403)
 
     if request.method == 'POST':
+        previous_description = job.description
         job.title = request.form['title']
         job.location = request.form['location']
         job.description = request.form['description']
         job.salary = request.form['salary']
         db.session.commit()
+        invalidate_job(job.id)
+
+        try:
+            job_search_index.add(job)
+            cache_job_embedding(job.description, previous_description)
+            job_index.add(job)
+        except Exception as e:
+            logging.error(f"Failed to precompute job embedding: {e}")
+
         flash('Job updated successfully!', 'success')
         return redirect(url_for('main.my_jobs'))
 
@@ -163,8 +269,19 @@ def delete_job(job_id):
     if job.user_id != g.user.id:
         abort(403)
 
+    description = job.description
     db.session.delete(job)
     db.session.commit()
+    invalidate_job(job_id)
+
+    try:
+        job_search_index.remove(job_id)
+        invalidate_job_embedding(description)
+        job_index.remove(job_id)
+        delete_job_analytics(job_id)
+    except Exception as e:
+        logging.error(f"Failed to drop derived data of job {job_id}: {e}")
+
     flash('Job deleted successfully!', 'success')
     return redirect(url_for('main.my_jobs'))
 
@@ -229,9 +346,21 @@ def settings():
                 cv_file = request.files['cv_file']
                 if cv_file and allowed_file(cv_file.filename, {'pdf'}):
                     cv_filename = secure_filename(cv_file.filename)
-                    cv_file.save(os.path.join(current_app.config['UPLOAD_FOLDER_CV'], cv_filename))
+                    cv_path = os.path.join(current_app.config['UPLOAD_FOLDER_CV'], cv_filename)
+                    cv_file.save(cv_path)
                     user.cv_file = cv_filename
 
+                    # Extract the text and embedding once so applications don't have to
+                    try:
+                        user.cv_hash, user.cv_text = precompute_cv(cv_path)
+                    except IngestError as e:
+                        db.session.rollback()
+                        flash(str(e), 'danger')
+                        return redirect(url_for('main.settings'))
+                    except Exception as e:
+                        logging.error(f"Failed to precompute CV: {e}")
+                        user.cv_hash, user.cv_text = None, None
+
             # Commit changes to the database
             try:
                 db.session.commit()
@@ -251,9 +380,18 @@ def job_detail(job_id):
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
+    # Check the edit time first so that a 304 doesn't load the description
+    updated_at = Job.query.with_entities(Job.updated_at).filter_by(id=job_id).scalar()
+    if updated_at is None:
+        abort(404)
+    etag = make_etag('job', job_id, updated_at, viewer_version(g.user))
+    unchanged = not_modified(etag, updated_at)
+    if unchanged is not None:
+        return unchanged
+
     job = Job.query.get_or_404(job_id)
-    job.description = markdown(job.description)
-    return render_template('job_detail.html', job=job)
+    response = make_response(render_template('job_detail.html', job=job, description_html=job_description_html(job)))
+    return cacheable(response, etag, job.updated_at)
 
 @main.route('/apply/<int:job_id>', methods=['GET'])
 def apply(job_id):
@@ -264,12 +402,8 @@ def apply(job_id):
     job = Job.query.get_or_404(job_id)
 
     existing_application_sqlite = Application.query.filter_by(user_id=g.user.id, job_id=job_id).first()
-    existing_application_mongo = applications_collection.find_one({
-        'user_id': str(g.user.id),
-        'job_id': str(job_id)
-    })
 
-    if existing_application_sqlite or existing_application_mongo:
+    if existing_application_sqlite or mongo.has_applied(g.user.id, job_id):
         flash('You have already applied for this job.', 'alert')
         return redirect(url_for('main.job_detail', job_id=job_id))
 
@@ -282,27 +416,41 @@ def apply(job_id):
         flash('CV file not found. Please upload again.', 'danger')
         return redirect(url_for('main.settings'))
 
-    try:
-        with pdfplumber.open(cv_path) as pdf:
-            text = ''.join(page.extract_text() for page in pdf.pages if page.extract_text())
-    except Exception as e:
-        logging.error(f"Failed to process CV: {e}")
-        flash('Failed to process CV.', 'danger')
-        return redirect(url_for('main.job_detail', job_id=job_id))
+    text = g.user.cv_text
+    if not text:
+        # CVs uploaded before text precomputation are processed once and stored
+        try:
+            cv_hash = file_hash(cv_path)
+            text = extract_cv_text(cv_path, cv_hash)
+            g.user.cv_hash, g.user.cv_text = cv_hash, text
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to process CV: {e}")
+            flash('Failed to process CV.', 'danger')
+            return redirect(url_for('main.job_detail', job_id=job_id))
 
     match, similarity_score = evaluate_cv(text, job.description)
     if not match:
         flash(f'Your CV does not match the job requirements. Similarity score: {similarity_score:.2f}', 'error')
         return redirect(url_for('main.job_detail', job_id=job_id))
 
-    questions = generate_interview_questions(text, job.description)
-    session['questions'] = questions
-    session['current_question'] = 0
-    session['responses'] = {}
-    session['job_id'] = job_id
-    session['similarity_score'] = similarity_score
-
-    return redirect(url_for('main.interview_questions'))
+    # Question generation can take minutes with retries, so it runs on the task queue
+    task_id = task_queue.submit('interview_questions', g.user.id, {
+        'cv_text': text,
+        'job_description': job.description
+    })
+    # Drop any interview the candidate abandoned; the session only carries the new id
+    interview_store.delete(session.get('interview_id'))
+    interview = interview_store.create(g.user.id, job_id, similarity_score, task_id)
+    session['interview_id'] = interview['id']
+
+    return render_template('loading.html',
+                           title='Preparing Your Interview',
+                           message='Please wait while we generate your interview questions.',
+                           status_url=url_for('main.task_status', task_id=task_id),
+                           ready_at=1,
+                           next_url=url_for('main.interview_questions'))
 
 @main.route('/interview_questions', methods=['GET', 'POST'])
 def interview_questions():
@@ -310,34 +458,91 @@ def interview_questions():
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
-    questions = session.get('questions')
-    current_question = session.get('current_question', 0)
-    responses = session.get('responses', {})
+    interview = interview_store.get(session.get('interview_id'), g.user.id)
+    if interview is None:
+        flash('No interview in progress.', 'danger')
+        return redirect(url_for('main.home'))
+
+    questions = interview['questions']
+    complete = questions is not None
+    if not complete:
+        task = task_queue.get(interview['questions_task'])
+        if task is None or task.user_id != g.user.id:
+            flash('No interview in progress.', 'danger')
+            return redirect(url_for('main.home'))
+        if task.status == 'failed':
+            flash('Could not generate interview questions. Please try again later.', 'danger')
+            return redirect(url_for('main.job_detail', job_id=interview['job_id']))
+        # While the task runs, its result holds the questions generated so far
+        questions = json.loads(task.result)['questions'] if task.result else []
+        if task.status == 'done':
+            interview['questions'] = questions
+            interview_store.save(interview)
+            complete = True
+
+    current_question = interview['current_question']
 
     if request.method == 'POST':
         response = request.form.get('response')
-        if response:
-            responses[str(current_question)] = response
-            session['responses'] = responses
+        if response and current_question < len(questions):
+            interview['responses'][str(current_question)] = response
+            if current_app.config['FEEDBACK_PIPELINED']:
+                # Score the answer while the candidate works on the next question
+                interview.setdefault('answer_tasks', {})[str(current_question)] = task_queue.submit(
+                    'answer_feedback', g.user.id, {
+                        'job_id': interview['job_id'],
+                        'question': questions[current_question],
+                        'response': response
+                    })
             current_question += 1
-            session['current_question'] = current_question
+            interview['current_question'] = current_question
+            interview_store.save(interview)
 
-            if current_question >= len(questions):
+            if complete and current_question >= len(questions):
                 return redirect(url_for('main.review_responses'))
 
     if current_question < len(questions):
         question = questions[current_question]
         return render_template('interview_questions.html', question_number=current_question + 1, question_text=question)
-    else:
+    if complete:
         return redirect(url_for('main.review_responses'))
 
+    # The candidate caught up with the generation; wait for the next question
+    return render_template('loading.html',
+                           title='Preparing Your Interview',
+                           message='Please wait while we generate the next question.',
+                           status_url=url_for('main.task_status', task_id=interview['questions_task']),
+                           ready_at=current_question + 1,
+                           next_url=url_for('main.interview_questions'))
+
 @main.route('/review_responses')
 def review_responses():
     if g.user is None:
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
-    return render_template('loading.html', next_url = url_for('main.generate_feedbacks'))
+    interview = interview_store.get(session.get('interview_id'), g.user.id)
+    if interview is None or not interview['questions']:
+        flash('No interview in progress.', 'danger')
+        return redirect(url_for('main.home'))
+
+    # Submit once; reloading this page keeps polling the same task
+    task_id = interview['feedback_task']
+    if task_id is None:
+        task_id = task_queue.submit('feedbacks', g.user.id, {
+            'user_id': g.user.id,
+            'job_id': interview['job_id'],
+            'similarity_score': interview['similarity_score'],
+            'questions': interview['questions'],
+            'responses': interview['responses'],
+            'answer_tasks': interview.get('answer_tasks', {})
+        })
+        interview['feedback_task'] = task_id
+        interview_store.save(interview)
+
+    return render_template('loading.html',
+                           status_url=url_for('main.task_status', task_id=task_id),
+                           next_url=url_for('main.generate_feedbacks'))
 
 @main.route('/generate_feedbacks')
 def generate_feedbacks():
@@ -345,59 +550,52 @@ def generate_feedbacks():
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
-    responses = session.get('responses', {})
-    questions = session.get('questions', [])
-    job_id = session.get('job_id')
-    job = Job.query.get_or_404(job_id)
-    similarity_score = session.get('similarity_score')
-
-    feedback_list = []
-    for idx, response in responses.items():
-        question = questions[int(idx)]
-        feedback = generate_feedback(question, response, job.description)
-        score = extract_score(feedback)
-        time.sleep(2)  
-        feedback_list.append({
-            'question': question,
-            'response': response,
-            'feedback': feedback,
-            'score':score
-        })
+    interview = interview_store.get(session.get('interview_id'), g.user.id)
+    task = task_queue.get(interview['feedback_task']) if interview else None
+    if task is None or task.user_id != g.user.id:
+        flash('No interview in progress.', 'danger')
+        return redirect(url_for('main.home'))
 
-    new_application = Application(
-        user_id=g.user.id,
-        job_id=job_id,
-        message=similarity_score,
-        timestamp=datetime.utcnow(),
-        status='Pending'
-    )
-    db.session.add(new_application)
-    db.session.commit()
+    if task.status == 'failed':
+        interview['feedback_task'] = None
+        interview_store.save(interview)
+        flash('Failed to submit your application. Please try again.', 'danger')
+        return redirect(url_for('main.review_responses'))
+    if task.status != 'done':
+        return redirect(url_for('main.review_responses'))
 
-    application_data = {
-        'application_id': str(new_application.id),
-        'user_id': str(g.user.id),
-        'job_id': str(job_id),
-        'responses': convert_keys_to_strings(responses),
-        'feedback': feedback_list
-    }
-    applications_collection.insert_one(application_data)
+    interview_store.delete(interview['id'])
+    session.pop('interview_id', None)
 
     flash('Application submitted successfully!', 'success')
     return redirect(url_for('main.view_applications'))
 
+@main.route('/task_status/<task_id>')
+def task_status(task_id):
+    if g.user is None:
+        abort(403)
+
+    task = task_queue.get(task_id)
+    if task is None:
+        abort(404)
+    if task.user_id != g.user.id:
+        abort(403)
+
+    progress = json.loads(task.result).get('progress') if task.result else None
+    return jsonify({'id': task.id, 'kind': task.kind, 'status': task.status, 'error': task.error, 'progress': progress})
+
 @main.route('/view_applications')
 def view_applications():
     if g.user is None:
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
-    applications = Application.query.filter_by(user_id=g.user.id).all()
+    # Load the jobs in the same query instead of one query per application
+    applications = Application.query.options(joinedload(Application.job)).filter_by(user_id=g.user.id).all()
 
-    # Fetch job details for each application
     applications_list = []
     for app in applications:
-        job = Job.query.get(app.job_id)
+        job = app.job
         applications_list.append({
             'id': app.id,
             'job_title': job.title if job else 'Unknown',
@@ -417,10 +615,10 @@ def view_candidates(job_id):
     if job.user_id != g.user.id:
         abort(403)
 
-    applications = Application.query.filter_by(job_id=job_id).all()
+    applications = Application.query.options(joinedload(Application.user)).filter_by(job_id=job_id).all()
     candidates = []
     for app in applications:
-        user = User.query.get(app.user_id)
+        user = app.user
         candidates.append({
             'application_id': app.id,
             'name': f"{user.first_name} {user.last_name}",
@@ -432,6 +630,31 @@ def view_candidates(job_id):
 
     return render_template('view_candidates.html', candidates=candidates, job=job)
 
+@main.route('/screen_candidates/<int:job_id>')
+def screen_candidates_view(job_id):
+    if g.user is None:
+        flash('You need to sign in first.', 'danger')
+        return redirect(url_for('main.auth'))
+
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != g.user.id:
+        abort(403)
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = current_app.config['SCREENING_PER_PAGE']
+    ranked, total = screen_candidates(job, page, per_page)
+
+    candidates = [{
+        'rank': (page - 1) * per_page + position,
+        'name': f"{user.first_name} {user.last_name}",
+        'email': user.email,
+        'phone': user.phone_number,
+        'similarity': score
+    } for position, (user, score) in enumerate(ranked, start=1)]
+
+    return render_template('screen_candidates.html', candidates=candidates, job=job, page=page,
+                           has_next=page * per_page < total, total=total)
+
 @main.route('/view_interview/<int:application_id>')
 def view_interview(application_id):
     if g.user is None:
@@ -443,13 +666,11 @@ def view_interview(application_id):
     if job.user_id != g.user.id:
         abort(403)
 
-    application_data = applications_collection.find_one({'application_id': str(application_id)})
-    if not application_data:
+    feedback_list = mongo.get_feedback(application_id)
+    if feedback_list is None:
         flash('Interview data not found.', 'danger')
         return redirect(url_for('main.view_candidates', job_id=job.id))
 
-    feedback_list = application_data.get('feedback', [])
-    
     # Pass application_id to the template
     return render_template('view_interview.html', feedback_list=feedback_list, applicant=application.user, application_id=application_id)
 
@@ -464,8 +685,10 @@ def accept_application(application_id):
     if job.user_id != g.user.id:
         abort(403)
 
+    previous_status = application.status
     application.status = 'Accepted'
     db.session.commit()
+    record_status_change(job.id, previous_status, application.status)
     flash('Application accepted.', 'success')
     return redirect(url_for('main.view_candidates', job_id=job.id))
 
@@ -480,8 +703,10 @@ def reject_application(application_id):
     if job.user_id != g.user.id:
         abort(403)
 
+    previous_status = application.status
     application.status = 'Rejected'
     db.session.commit()
+    record_status_change(job.id, previous_status, application.status)
     flash('Application rejected.', 'success')
     return redirect(url_for('main.view_candidates', job_id=job.id))
 
@@ -491,7 +716,9 @@ def dashboard():
         flash('You need to sign in first.', 'danger')
         return redirect(url_for('main.auth'))
 
-    jobs = Job.query.filter_by(user_id=g.user.id).all()
+    # The job picker only needs ids and titles
+    jobs = Job.query.with_entities(Job.id, Job.title).filter_by(user_id=g.user.id) \
+        .order_by(Job.date_posted.desc(), Job.id.desc()).all()
     return render_template('dashboard.html', jobs=jobs)
 
 @main.route('/get_job_data/<int:job_id>')
@@ -503,65 +730,36 @@ def get_job_data(job_id):
     if job.user_id != g.user.id:
         abort(403)
 
-    applications = Application.query.filter_by(job_id=job_id).all()
-    candidates = []
-    ages = []
-    questions_responses = []
-
-    for app in applications:
-        candidate = User.query.get(app.user_id)
-        feedback_data = applications_collection.find_one({'application_id': str(app.id)})
-        total_score = sum(fb['score'] for fb in feedback_data.get('feedback', []) if fb['score'] is not None)
-
-        # Calculate age from birthday
-        try:
-            birthday = datetime.strptime(candidate.birthday, "%Y-%m-%d")
-            today = datetime.now()
-            age = today.year - birthday.year - ((today.month, today.day) < (birthday.month, birthday.day))
-        except ValueError:
-            age = None  # or set a default value if the birthday format is incorrect
-
-        if age is not None:
-            ages.append(age)
-
-        candidates.append({
-            'name': f"{candidate.first_name} {candidate.last_name}",
-            'score': total_score,
-            'app_id': app.id  # Store app ID for later use
-        })
-
-        # Add questions and responses
-        if feedback_data:
-            for feedback in feedback_data.get('feedback', []):
-                # Handle None score values by setting them to 0
-                score = feedback.get('score', 0) or 0
-                questions_responses.append({
-                    'question': feedback.get('question', ''),
-                    'response': feedback.get('response', ''),
-                    'score': score
-                })
-
-    # Sort candidates by score and select the top 3
-    top_candidates = sorted(candidates, key=lambda x: x['score'], reverse=True)[:3]
-
-    # Add similarity score for top 3 candidates
-    for candidate in top_candidates:
-        app = Application.query.get(candidate['app_id'])
-        try:
-            similarity_score = float(app.message)
-        except ValueError:
-            similarity_score = 0.0  # Default value if conversion fails
-
-        candidate['similarity'] = similarity_score  # Add similarity score to top candidates
-
-    # Prepare data for both top candidates and all candidates
-    all_candidates = [{'name': c['name'], 'totalScore': c['score']} for c in candidates]
+    # Served from the job's materialized aggregate, which is updated as applications come in
+    analytics = get_job_analytics(job_id)
+    top_candidates = analytics['top_candidates'][:3]
     scores = [{'name': c['name'], 'totalScore': c['score'], 'similarity': c.get('similarity', 0)} for c in top_candidates]
 
     return jsonify({
         'topCandidates': top_candidates,
-        'allCandidates': all_candidates,
+        'allCandidates': analytics['all_candidates'],
         'scores': scores,
-        'ages': ages,
-        'questionsResponses': sorted(questions_responses, key=lambda x: x['score'], reverse=True)
+        'ageGroups': analytics['age_buckets'],
+        'scoreHistogram': analytics['score_histogram'],
+        'counts': analytics['counts']
+    })
+
+@main.route('/get_job_responses/<int:job_id>')
+def get_job_responses(job_id):
+    if g.user is None:
+        abort(403)
+
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != g.user.id:
+        abort(403)
+
+    # Every response to the job, best score first, a page at a time
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = current_app.config['DASHBOARD_RESPONSES_PER_PAGE']
+    responses, total = mongo.get_responses(job_id, (page - 1) * per_page, per_page)
+    return jsonify({
+        'responses': responses,
+        'page': page,
+        'perPage': per_page,
+        'total': total
     })
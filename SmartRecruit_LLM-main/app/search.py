@@ -0,0 +1,256 @@
+import re
+import math
+import threading
+from array import array
+from collections import Counter
+import numpy as np
+
+from .vector_index import SyncedIndex
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the this to we will with you your
+""".split())
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase search terms, keeping tokens such as 'c++' and 'c#' intact.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: The terms, in order, without stopwords.
+    """
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index with Okapi BM25 ranking.
+
+    Each term maps to two packed arrays holding the rows of the documents that contain
+    it and the term frequency in each, so a query only touches the postings of its own
+    terms and scores them in one vectorized pass per term. Removed documents are
+    tombstoned and the postings are compacted once tombstones outnumber live rows.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, title_weight=2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._terms = {}
+        self._postings = []
+        self._df = array('I')
+        self._doc_ids = []
+        self._doc_terms = []
+        self._lengths = array('f')
+        self._alive = bytearray()
+        self._rows = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    def ids(self):
+        """
+        Lists the indexed ids.
+
+        Returns:
+            list: The ids of all indexed documents.
+        """
+        with self._lock:
+            return list(self._rows)
+
+    def add(self, doc_id, title, text):
+        """
+        Indexes a document, replacing any existing document with the same id.
+        Title terms count `title_weight` times.
+
+        Args:
+            doc_id (int): The id of the document.
+            title (str): The document title.
+            text (str): The document body.
+        """
+        tokens = tokenize(title) * self.title_weight + tokenize(text)
+        counts = Counter(tokens)
+        with self._lock:
+            if doc_id in self._rows:
+                self._remove_row(self._rows.pop(doc_id))
+            row = len(self._doc_ids)
+            term_ids = array('I')
+            for term, tf in counts.items():
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    term_id = self._terms[term] = len(self._postings)
+                    self._postings.append((array('I'), array('H')))
+                    self._df.append(0)
+                rows, tfs = self._postings[term_id]
+                rows.append(row)
+                tfs.append(min(tf, 65535))
+                self._df[term_id] += 1
+                term_ids.append(term_id)
+            self._rows[doc_id] = row
+            self._doc_ids.append(doc_id)
+            self._doc_terms.append(term_ids)
+            self._lengths.append(len(tokens))
+            self._alive.append(1)
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id):
+        """
+        Removes a document from the index.
+
+        Args:
+            doc_id (int): The id of the document.
+        """
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return
+            self._remove_row(row)
+            if len(self._doc_ids) - len(self._rows) > max(1024, len(self._rows)):
+                self._compact()
+
+    def search(self, query, k=10, exclude=None):
+        """
+        Ranks the documents matching any of the query terms by BM25.
+
+        Args:
+            query (str): The search query.
+            k (int): The number of results to return.
+            exclude (set): Ids that must not be returned.
+
+        Returns:
+            list: (id, BM25 score) pairs, best match first.
+        """
+        with self._lock:
+            term_ids = {self._terms[term] for term in tokenize(query) if term in self._terms}
+            if not term_ids or not self._rows:
+                return []
+            count = len(self._rows)
+            average_length = self._total_length / count or 1.0
+            lengths = np.array(self._lengths, dtype=np.float32)
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+            for term_id in term_ids:
+                df = self._df[term_id]
+                if df == 0:
+                    continue
+                rows, tfs = self._postings[term_id]
+                rows = np.array(rows, dtype=np.intp)
+                tfs = np.array(tfs, dtype=np.float32)
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * lengths[rows] / average_length)
+                scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+            scores[np.frombuffer(bytes(self._alive), dtype=np.uint8) == 0] = 0
+            for doc_id in exclude or ():
+                row = self._rows.get(doc_id)
+                if row is not None:
+                    scores[row] = 0
+            doc_ids = list(self._doc_ids)
+
+        matches = np.flatnonzero(scores > 0)
+        if len(matches) > k:
+            matches = matches[np.argpartition(-scores[matches], k - 1)[:k]]
+        matches = matches[np.argsort(-scores[matches])]
+        return [(doc_ids[row], float(scores[row])) for row in matches]
+
+    def _remove_row(self, row):
+        for term_id in self._doc_terms[row]:
+            self._df[term_id] -= 1
+        self._total_length -= int(self._lengths[row])
+        self._doc_terms[row] = None
+        self._doc_ids[row] = None
+        self._alive[row] = 0
+
+    def _compact(self):
+        # Renumber the live rows and rebuild the postings without the tombstones
+        live_rows = [row for row in range(len(self._doc_ids)) if self._alive[row]]
+        new_rows = {old: new for new, old in enumerate(live_rows)}
+        postings = [(array('I'), array('H')) for _ in self._postings]
+        for term_id, (rows, tfs) in enumerate(self._postings):
+            for row, tf in zip(rows, tfs):
+                new_row = new_rows.get(row)
+                if new_row is not None:
+                    postings[term_id][0].append(new_row)
+                    postings[term_id][1].append(tf)
+        self._postings = postings
+        self._doc_ids = [self._doc_ids[row] for row in live_rows]
+        self._doc_terms = [self._doc_terms[row] for row in live_rows]
+        self._lengths = array('f', (self._lengths[row] for row in live_rows))
+        self._alive = bytearray(b'\x01' * len(live_rows))
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._doc_ids)}
+
+
+class JobSearchIndex(SyncedIndex):
+    """
+    Full-text index over job titles and descriptions.
+    Synced with the job table the same way as the job vector index.
+    """
+
+    def __init__(self, app=None):
+        self._synced_until = None
+        super().__init__(None, app)
+
+    def init_app(self, app):
+        super().init_app(app)
+        self._synced_until = None
+
+    def add(self, job):
+        """
+        Indexes a newly created or edited job.
+
+        Args:
+            job (Job): The job to index.
+        """
+        self._ensure_synced().add(job.id, job.title, job.description)
+
+    def remove(self, job_id):
+        """
+        Removes a deleted job from the index.
+
+        Args:
+            job_id (int): The id of the deleted job.
+        """
+        self._ensure_synced().remove(job_id)
+
+    def search(self, query, k=10, exclude=None):
+        """
+        Finds the jobs that best match a keyword query.
+
+        Args:
+            query (str): The search query.
+            k (int): The number of results to return.
+            exclude (set): Job ids that must not be returned.
+
+        Returns:
+            list: (job id, BM25 score) pairs, best match first.
+        """
+        return self._ensure_synced().search(query, k, exclude)
+
+    def _new_index(self):
+        return InvertedIndex()
+
+    def _sync(self, index, full_build):
+        from .models import Job
+
+        query = Job.query.with_entities(Job.id, Job.title, Job.description, Job.updated_at)
+        if not full_build and self._synced_until is not None:
+            # >= so that jobs written within the same timestamp are not missed
+            query = query.filter(Job.updated_at >= self._synced_until)
+        changed = query.all()
+        for job_id, title, description, _ in changed:
+            index.add(job_id, title, description)
+        if changed:
+            self._synced_until = max(updated_at for _, _, _, updated_at in changed)
+
+        if not full_build:
+            live_ids = {job_id for (job_id,) in Job.query.with_entities(Job.id)}
+            for job_id in index.ids():
+                if job_id not in live_ids:
+                    index.remove(job_id)
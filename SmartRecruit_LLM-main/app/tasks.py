@@ -0,0 +1,415 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import and_, or_
+
+from . import db
+
+
+class TaskQueue:
+    """
+    Runs slow work (LLM calls) off the request on a pool of worker threads.
+
+    Every task is recorded in the `task` table, so its status can be polled from any
+    worker process and survives restarts. A task is claimed with a conditional UPDATE,
+    which lets several processes recover tasks without running them twice.
+
+    A running task holds a lease: its `updated_at` is refreshed by a heartbeat while it
+    runs. Tasks left pending, or running with an expired lease because their worker
+    was killed (a gunicorn timeout, a deploy), are reclaimed by whichever process next
+    scans for them, up to `max_attempts` runs.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.handlers = {}
+        self.max_workers = 4
+        self.max_attempts = 3
+        self.recover_after = timedelta(seconds=60)
+        self.recover_interval = 30
+        self._executor = None
+        self._pid = None
+        self._running = set()
+        self._last_recovery = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the queue from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.app = app
+        self.max_workers = app.config['TASK_WORKERS']
+        self.max_attempts = app.config['TASK_MAX_ATTEMPTS']
+        self.recover_after = timedelta(seconds=app.config['TASK_RECOVER_AFTER_SECONDS'])
+        self.recover_interval = app.config['TASK_RECOVER_INTERVAL_SECONDS']
+
+    def handler(self, kind, progress=False):
+        """
+        Registers the function that runs tasks of a given kind.
+        The function receives the decoded payload and returns a JSON-serialisable result.
+
+        Args:
+            kind (str): The task kind.
+            progress (bool): Whether the function also receives a `progress(result)` callback,
+                which stores a partial result that pollers can use before the task is done.
+                The `progress` key of a partial result is reported by the task status endpoint.
+        """
+        def decorator(fn):
+            self.handlers[kind] = (fn, progress)
+            return fn
+        return decorator
+
+    def submit(self, kind, user_id, payload):
+        """
+        Records a new task and schedules it on the worker pool.
+
+        Args:
+            kind (str): The task kind, which must have a registered handler.
+            user_id (int): The user who owns the task.
+            payload (dict): The JSON-serialisable task input.
+
+        Returns:
+            str: The id of the new task.
+        """
+        from .models import Task
+
+        task = Task(id=str(uuid.uuid4()), kind=kind, user_id=user_id, status='pending', payload=json.dumps(payload))
+        db.session.add(task)
+        db.session.commit()
+        self._ensure_executor().submit(self._run, task.id)
+        self._maybe_recover()
+        return task.id
+
+    def get(self, task_id):
+        """
+        Loads a task record.
+
+        Args:
+            task_id (str): The id of the task.
+
+        Returns:
+            Task: The task, or None if it does not exist.
+        """
+        from .models import Task
+
+        # Task pages poll this, so abandoned tasks are recovered while someone waits on them
+        self._maybe_recover()
+        return Task.query.get(task_id)
+
+    def wait(self, task_ids, timeout):
+        """
+        Waits for tasks submitted earlier, e.g. by previous requests, to finish.
+
+        Tasks still pending, or abandoned by a dead worker, are claimed and run on the
+        calling thread rather than waited for, so a task waiting on others can't
+        deadlock a busy worker pool.
+
+        Args:
+            task_ids (list): The ids of the tasks.
+            timeout (float): The maximum number of seconds to wait for running tasks.
+
+        Returns:
+            dict: The tasks by id, in whatever state they reached.
+        """
+        from .models import Task
+
+        if not task_ids:
+            return {}
+        self._ensure_executor()
+        for task_id in task_ids:
+            self._run(task_id)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            running = Task.query.with_entities(Task.id) \
+                .filter(Task.id.in_(task_ids), Task.status.in_(('pending', 'running'))).count()
+            if not running:
+                break
+            time.sleep(0.2)
+        db.session.expire_all()
+        return {task.id: task for task in Task.query.filter(Task.id.in_(task_ids))}
+
+    def _ensure_executor(self):
+        # Threads do not survive a fork, so every worker process starts its own pool and heartbeat
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='task')
+                self._pid = os.getpid()
+                self._running = set()
+                self._last_recovery = 0.0
+                threading.Thread(target=self._heartbeat, name='task-heartbeat', daemon=True).start()
+            return self._executor
+
+    def _heartbeat(self):
+        from .models import Task
+
+        # Several beats per lease, so one slow commit doesn't let a live task look abandoned
+        interval = max(1.0, self.recover_after.total_seconds() / 4)
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(interval)
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                with self.app.app_context():
+                    Task.query.filter(Task.id.in_(running), Task.status == 'running') \
+                        .update({'updated_at': datetime.utcnow()}, synchronize_session=False)
+                    db.session.commit()
+            except Exception as e:
+                logging.error(f"Failed to refresh task leases: {e}")
+
+    def _maybe_recover(self):
+        if time.monotonic() - self._last_recovery >= self.recover_interval:
+            self._last_recovery = time.monotonic()
+            self._ensure_executor().submit(self._recover)
+
+    def _recover(self):
+        from .models import Task
+
+        with self.app.app_context():
+            cutoff = datetime.utcnow() - self.recover_after
+            stale = Task.query.with_entities(Task.id, Task.status) \
+                .filter(Task.status.in_(('pending', 'running')), Task.updated_at < cutoff).all()
+        for task_id, status in stale:
+            logging.info(f"Recovering {status} task {task_id}")
+            self._executor.submit(self._run, task_id)
+
+    def _run(self, task_id):
+        from .models import Task
+
+        with self.app.app_context():
+            now = datetime.utcnow()
+            # Pending, or running under a lease that expired because its worker died
+            claimed = Task.query.filter(Task.id == task_id, or_(
+                Task.status == 'pending',
+                and_(Task.status == 'running', Task.updated_at < now - self.recover_after)
+            )).update({'status': 'running', 'updated_at': now, 'attempts': Task.attempts + 1},
+                      synchronize_session=False)
+            db.session.commit()
+            if not claimed:
+                return
+
+            task = Task.query.get(task_id)
+            if task.attempts > self.max_attempts:
+                logging.error(f"Task {task_id} ({task.kind}) abandoned after {self.max_attempts} attempts")
+                task.error = f"The task was interrupted {self.max_attempts} times."
+                task.status = 'failed'
+                db.session.commit()
+                return
+
+            with self._lock:
+                self._running.add(task_id)
+            try:
+                fn, progress = self.handlers[task.kind]
+                args = (json.loads(task.payload),)
+                if progress:
+                    args += (lambda partial: self._save_progress(task_id, partial),)
+                result = fn(*args)
+                task.result = json.dumps(result)
+                task.status = 'done'
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Task {task_id} ({task.kind}) failed: {e}")
+                task = Task.query.get(task_id)
+                task.error = str(e)
+                task.status = 'failed'
+            finally:
+                with self._lock:
+                    self._running.discard(task_id)
+            db.session.commit()
+
+    def _save_progress(self, task_id, partial):
+        from .models import Task
+
+        Task.query.filter_by(id=task_id, status='running') \
+            .update({'result': json.dumps(partial), 'updated_at': datetime.utcnow()})
+        db.session.commit()
+
+
+task_queue = TaskQueue()
+
+
+@task_queue.handler('interview_questions', progress=True)
+def run_interview_questions(payload, progress):
+    """
+    Generates the interview questions for an application, publishing every question
+    as soon as it is generated so the candidate can start answering.
+
+    Args:
+        payload (dict): The CV text and job description.
+        progress (callable): Stores the questions generated so far.
+
+    Returns:
+        dict: The generated questions.
+    """
+    from .utils import generate_interview_questions
+
+    generated = []
+
+    def publish(question):
+        generated.append(question)
+        progress({'questions': generated, 'progress': len(generated)})
+
+    questions = generate_interview_questions(payload['cv_text'], payload['job_description'], on_question=publish,
+                                             stream=task_queue.app.config['LLM_STREAMING'])
+    if questions and questions[0].startswith('Error:'):
+        raise RuntimeError(questions[0])
+    return {'questions': questions}
+
+
+@task_queue.handler('answer_feedback')
+def run_answer_feedback(payload):
+    """
+    Scores one interview response as soon as the candidate submits it, so that most
+    of an interview is scored by the time its last answer comes in.
+
+    Args:
+        payload (dict): The job, question and response.
+
+    Returns:
+        dict: The feedback and the LLM usage spent on it.
+    """
+    from .models import Job
+    from .llm import LLMUsage
+    from .utils import generate_feedback
+
+    job = Job.query.get(payload['job_id'])
+    if job is None:
+        raise RuntimeError('Job no longer exists.')
+    usage = LLMUsage()
+    feedback = generate_feedback(payload['question'], payload['response'], job.description, usage)
+    if feedback.startswith('Error:'):
+        # Fail the task so the application is rescored when it is submitted
+        raise RuntimeError(feedback)
+    return {'feedback': feedback, 'usage': usage.as_dict()}
+
+
+def collect_answer_feedbacks(answer_tasks, timeout):
+    """
+    Gathers the feedback of the responses scored during the interview.
+
+    Args:
+        answer_tasks (dict): The answer_feedback task id by question index.
+        timeout (float): The maximum number of seconds to wait for tasks still running.
+
+    Returns:
+        tuple: (feedback by question index, usage dict summed over the collected tasks).
+    """
+    tasks = task_queue.wait(list(answer_tasks.values()), timeout)
+    feedbacks, usage = {}, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'seconds': 0.0}
+    for idx, task_id in answer_tasks.items():
+        task = tasks.get(task_id)
+        if task is not None and task.status == 'done':
+            result = json.loads(task.result)
+            feedbacks[idx] = result['feedback']
+            for key in usage:
+                usage[key] += result['usage'][key]
+    return feedbacks, usage
+
+
+@task_queue.handler('feedbacks')
+def run_feedbacks(payload):
+    """
+    Scores the interview responses and stores the application in SQLite and MongoDB.
+
+    Responses already scored by their answer_feedback task are reused; the rest, and
+    any whose task failed or timed out, are scored here.
+
+    Safe to run again for the same submission (a retried task, or a resubmission after
+    a failure): the Application row is reused and the interview document replaced.
+
+    Args:
+        payload (dict): The applicant, job, similarity score, questions, responses and
+            answer_feedback task ids.
+
+    Returns:
+        dict: The id of the stored application.
+    """
+    from . import mongo
+    from .models import Job, Application
+    from .analytics import record_application, rebuild_all_job_analytics
+    from .llm import LLMUsage
+    from .utils import generate_feedbacks_concurrently, generate_feedbacks_batched, extract_score, convert_keys_to_strings
+
+    job = Job.query.get(payload['job_id'])
+    if job is None:
+        raise RuntimeError('Job no longer exists.')
+
+    questions = payload['questions']
+    responses = payload['responses']
+    question_responses = [(questions[int(idx)], response) for idx, response in responses.items()]
+    config = task_queue.app.config
+    start = time.monotonic()
+    pipelined, pipelined_usage = collect_answer_feedbacks(payload.get('answer_tasks') or {},
+                                                          config['FEEDBACK_WAIT_SECONDS'])
+    missing = [idx for idx in responses if idx not in pipelined]
+    missing_pairs = [(questions[int(idx)], responses[idx]) for idx in missing]
+    usage = LLMUsage()
+    if not missing_pairs:
+        scored = []
+    elif config['FEEDBACK_MODE'] == 'batched':
+        scored = generate_feedbacks_batched(missing_pairs, job.description, config['FEEDBACK_BATCH_SIZE'], usage)
+    else:
+        scored = generate_feedbacks_concurrently(missing_pairs, job.description, usage)
+    by_index = dict(pipelined, **dict(zip(missing, scored)))
+    feedbacks = [by_index[idx] for idx in responses]
+    # usage.seconds sums the calls; the wall time is what the candidate waited for after the last answer
+    scoring = {key: value + pipelined_usage[key] for key, value in usage.as_dict().items()}
+    scoring.update(seconds=round(scoring['seconds'], 3), mode=config['FEEDBACK_MODE'], pipelined=len(pipelined),
+                   wall_seconds=round(time.monotonic() - start, 3))
+    logging.info(f"Scored {len(question_responses)} responses for job {job.id}: {scoring}")
+
+    feedback_list = []
+    for (question, response), feedback in zip(question_responses, feedbacks):
+        feedback_list.append({
+            'question': question,
+            'response': response,
+            'feedback': feedback,
+            'score': extract_score(feedback)
+        })
+
+    # A previous run may have committed the row and died before storing the interview
+    new_application = Application.query.filter_by(user_id=payload['user_id'], job_id=job.id).first()
+    retried = new_application is not None
+    if not retried:
+        new_application = Application(
+            user_id=payload['user_id'],
+            job_id=job.id,
+            message=payload['similarity_score'],
+            timestamp=datetime.utcnow(),
+            status='Pending'
+        )
+        db.session.add(new_application)
+        db.session.commit()
+
+    application_data = {
+        'application_id': str(new_application.id),
+        'user_id': str(payload['user_id']),
+        'job_id': str(job.id),
+        'responses': convert_keys_to_strings(responses),
+        'feedback': feedback_list,
+        'scoring': scoring
+    }
+    mongo.save_application(application_data)
+
+    try:
+        if retried:
+            # Whether the previous run got to count it is unknown, so recount the job
+            rebuild_all_job_analytics([job.id])
+        else:
+            record_application(new_application, feedback_list)
+    except Exception as e:
+        logging.error(f"Failed to update analytics for job {job.id}: {e}")
+
+    return {'application_id': new_application.id, 'scoring': scoring}
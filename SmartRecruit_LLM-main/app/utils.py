@@ -2,16 +2,73 @@ import os
 from werkzeug.utils import secure_filename
 from flask import current_app
 import re
-import requests
+import hashlib
 import json
-import time
+import threading
 import logging
-import pdfplumber  # type: ignore
-from sentence_transformers import SentenceTransformer, util  # type: ignore
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from . import embedding_cache
+from .config import Config
+from .models import Job, User
+from .cache import LRUCache
+from .embeddings import content_hash, cosine_similarity, EmbeddingBatcher
+from .encoders import create_encoder
+from .chunking import PageChunker, chunk_text, max_sim
+from .ingest import PAGE_SEPARATOR, cv_ingestor
+from .vector_index import JobIndex, CvIndex
+from .search import JobSearchIndex
+from .llm import LLMClient, LLMError
+from .metrics import QUESTION_CACHE_LOOKUPS
+
+# The sentence transformer model is loaded on first use, see get_model()
+_model = None
+_model_lock = threading.Lock()
+embedding_batcher = EmbeddingBatcher(lambda texts: get_model().encode(texts, batch_size=len(texts)))
+job_index = JobIndex(lambda texts: get_cached_embeddings(texts))
+cv_index = CvIndex(lambda texts: get_cached_embeddings(texts))
+job_search_index = JobSearchIndex()
+llm_client = LLMClient()
+QUESTIONS_PER_INTERVIEW = 10
+# Generated question sets keyed by a hash of the CV, job description and generation parameters
+question_cache = LRUCache(max_entries=Config.QUESTION_CACHE_ENTRIES, ttl=Config.QUESTION_CACHE_TTL_SECONDS)
+# Screening rankings per (job id, description hash); expire with the CV index refresh
+screening_cache = LRUCache(max_entries=Config.SCREENING_CACHE_ENTRIES, ttl=Config.VECTOR_INDEX_REFRESH_SECONDS)
+# Embeddings of search queries, kept in memory only: they are user input, so they stay
+# out of the shared on-disk cache where they would grow it and evict job and CV entries
+query_embedding_cache = LRUCache(max_entries=Config.SEARCH_QUERY_CACHE_ENTRIES)
+logging.basicConfig(level=Config.LOG_LEVEL)
+
+def get_model():
+    """
+    Returns the sentence transformer model, loading it on first use.
+    Importing torch and loading the weights is deferred so that CLI entry points and
+    workers that never compute a similarity don't pay for it.
+
+    The inference backend is chosen by ENCODER_BACKEND, see `create_encoder`.
 
-# Initialize the sentence transformer model
-model = SentenceTransformer('multi-qa-mpnet-base-dot-v1')
-logging.basicConfig(level=logging.DEBUG)
+    Returns:
+        TorchEncoder, QuantizedTorchEncoder or OnnxEncoder: The loaded model.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = create_encoder(Config.ENCODER_BACKEND, Config.MODEL_NAME, Config.ENCODER_ONNX_DIR)
+    return _model
+
+def warm_up_model(encode=True):
+    """
+    Loads the model ahead of the first request and optionally runs a throwaway encode
+    so that lazy initialisation inside torch happens before serving traffic.
+
+    Args:
+        encode (bool): Whether to run a warm-up encode after loading.
+    """
+    model = get_model()
+    if encode:
+        model.encode(["warm up"])
 
 def create_upload_folders(app):
     """
@@ -37,6 +94,80 @@ def allowed_file(filename, allowed_extensions):
     """
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+def file_hash(path, chunk_size=65536):
+    """
+    Computes the SHA-256 hash of a file's contents.
+
+    Args:
+        path (str): The path of the file to hash.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_cv_text(cv_path, cv_hash=None):
+    """
+    Extracts the text of every page of a PDF CV on the ingestion worker pool.
+
+    Args:
+        cv_path (str): The path of the PDF file.
+        cv_hash (str): The hash of the file, to reuse previously extracted text.
+
+    Returns:
+        str: The text of all pages, separated by form feeds.
+
+    Raises:
+        IngestError: If the PDF is too long, too slow to parse, or unreadable.
+    """
+    return cv_ingestor.extract_text(cv_path, cv_hash)
+
+def precompute_cv(cv_path):
+    """
+    Extracts the text of an uploaded CV and caches its embedding so that applying
+    to a job requires no PDF parsing or encoding.
+
+    In chunked similarity mode the chunks of each page are encoded as soon as the page
+    is parsed, while the worker pool is still parsing the following pages.
+
+    Args:
+        cv_path (str): The path of the uploaded PDF file.
+
+    Returns:
+        tuple: The hash of the file and the extracted text.
+
+    Raises:
+        IngestError: If the PDF is too long, too slow to parse, or unreadable.
+    """
+    cv_hash = file_hash(cv_path)
+    chunked = Config.SIMILARITY_MODE == 'chunked'
+    text = cv_ingestor.cached_text(cv_hash)
+    if text is not None:
+        get_cached_embedding(text)
+        if chunked:
+            get_cached_chunk_embeddings(text)
+        return cv_hash, text
+
+    chunker = PageChunker(Config.CHUNK_WORDS, Config.CHUNK_OVERLAP_WORDS)
+    pages, chunk_embeddings = [], []
+    for page in cv_ingestor.iter_pages(cv_path, cv_hash):
+        pages.append(page)
+        chunks = chunker.feed(page) if chunked else []
+        if chunks:
+            chunk_embeddings.append(get_model().encode(chunks, batch_size=len(chunks)))
+
+    text = PAGE_SEPARATOR.join(pages)
+    if chunk_embeddings:
+        # Same chunks as chunk_text(text), so compute_similarity finds them under the text's key
+        embedding_cache.set(_chunk_key(text), np.concatenate(chunk_embeddings))
+    get_cached_embedding(text)
+    return cv_hash, text
+
 def preprocess_text(text):
     """
     Preprocesses the input text by removing unwanted characters and normalizing spaces.
@@ -51,9 +182,201 @@ def preprocess_text(text):
     text = re.sub(r'[^\w\s]', '', text)  
     return text
 
+def get_cached_embedding(text):
+    """
+    Returns the embedding of the text, encoding it only if it is not already cached.
+
+    Args:
+        text (str): The raw text to embed.
+
+    Returns:
+        numpy.ndarray: The embedding of the preprocessed text.
+    """
+    text = preprocess_text(text)
+    key = content_hash(text)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        embedding = embedding_batcher.encode(text)
+        embedding_cache.set(key, embedding)
+    return embedding
+
+def get_query_embedding(query):
+    """
+    Returns the embedding of a search query, from the in-memory query cache.
+
+    Args:
+        query (str): The raw search query.
+
+    Returns:
+        numpy.ndarray: The embedding of the preprocessed query.
+    """
+    text = preprocess_text(query)
+    embedding = query_embedding_cache.get(text)
+    if embedding is None:
+        embedding = embedding_batcher.encode(text)
+        query_embedding_cache.set(text, embedding)
+    return embedding
+
+def get_cached_embeddings(texts):
+    """
+    Returns the embeddings of several texts, encoding all cache misses in one batch.
+
+    Args:
+        texts (list): The raw texts to embed.
+
+    Returns:
+        list: The embeddings of the preprocessed texts, in input order.
+    """
+    texts = [preprocess_text(text) for text in texts]
+    keys = [content_hash(text) for text in texts]
+    embeddings = [embedding_cache.get(key) for key in keys]
+    misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if misses:
+        encoded = get_model().encode([texts[i] for i in misses])
+        for i, embedding in zip(misses, encoded):
+            embedding_cache.set(keys[i], embedding)
+            embeddings[i] = embedding
+    return embeddings
+
+def _chunk_key(text):
+    # The chunking parameters are part of the key, so changing them never serves stale chunks
+    return content_hash(f"chunks:{Config.CHUNK_WORDS}:{Config.CHUNK_OVERLAP_WORDS}:{text}")
+
+def get_cached_chunk_embeddings(text):
+    """
+    Returns the embeddings of the overlapping chunks of a text, encoding all chunks in
+    one batch on a cache miss. The chunk matrix is stored as a single cache entry.
+
+    Args:
+        text (str): The raw text to embed, with its line breaks.
+
+    Returns:
+        numpy.ndarray: One chunk embedding per row.
+    """
+    key = _chunk_key(text)
+    embeddings = embedding_cache.get(key)
+    if embeddings is None:
+        chunks = chunk_text(text, Config.CHUNK_WORDS, Config.CHUNK_OVERLAP_WORDS) or [preprocess_text(text)]
+        embeddings = get_model().encode(chunks, batch_size=len(chunks))
+        embedding_cache.set(key, embeddings)
+    return embeddings
+
+def recommend_jobs(user, k=5):
+    """
+    Ranks the jobs posted by other users against the user's CV using the job vector index.
+
+    Args:
+        user (User): The candidate, whose CV text must already be extracted.
+        k (int): The number of jobs to return.
+
+    Returns:
+        list: (Job, similarity) pairs, best match first.
+    """
+    own_job_ids = {job_id for (job_id,) in Job.query.with_entities(Job.id).filter_by(user_id=user.id)}
+    matches = job_index.search(get_cached_embedding(user.cv_text), k, exclude=own_job_ids)
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in matches]))}
+    return [(jobs[job_id], score) for job_id, score in matches if job_id in jobs]
+
+def search_jobs(query, k=200, exclude=None, hybrid_weight=0.0):
+    """
+    Ranks jobs against a keyword query with BM25, optionally blended with the embedding
+    similarity between the query and the job descriptions.
+
+    Both score lists are min-max normalised before blending. A job found by only one
+    of the two retrievers gets 0 for the other, since it ranked below that retriever's
+    top k anyway.
+
+    Args:
+        query (str): The search query.
+        k (int): The number of results to return.
+        exclude (set): Job ids that must not be returned.
+        hybrid_weight (float): Weight of the embedding similarity, between 0 and 1.
+
+    Returns:
+        list: (job id, score) pairs, best match first.
+    """
+    keyword_matches = job_search_index.search(query, k, exclude)
+    if hybrid_weight <= 0:
+        return keyword_matches
+
+    semantic_matches = job_index.search(get_query_embedding(query), k, exclude)
+    keyword_scores = _normalize_scores(keyword_matches)
+    semantic_scores = _normalize_scores(semantic_matches)
+    blended = {
+        job_id: (1 - hybrid_weight) * keyword_scores.get(job_id, 0.0) + hybrid_weight * semantic_scores.get(job_id, 0.0)
+        for job_id in keyword_scores.keys() | semantic_scores.keys()
+    }
+    return sorted(blended.items(), key=lambda item: item[1], reverse=True)[:k]
+
+def _normalize_scores(matches):
+    if not matches:
+        return {}
+    scores = [score for _, score in matches]
+    low, high = min(scores), max(scores)
+    return {item_id: (score - low) / (high - low) if high > low else 1.0 for item_id, score in matches}
+
+def screen_candidates(job, page=1, per_page=20):
+    """
+    Scores every stored CV against a job in one vectorized pass over the CV index.
+    Rankings are cached per version of the job description.
+
+    Args:
+        job (Job): The job to screen candidates for.
+        page (int): The 1-based page of results.
+        per_page (int): The number of candidates per page.
+
+    Returns:
+        tuple: A list of (User, similarity) pairs for the page and the total number of ranked candidates.
+    """
+    key = (job.id, content_hash(preprocess_text(job.description)))
+    ranking = screening_cache.get(key)
+    if ranking is None:
+        ranking = cv_index.search(get_cached_embedding(job.description),
+                                  current_app.config['SCREENING_MAX_RESULTS'], exclude={job.user_id})
+        screening_cache.set(key, ranking)
+
+    page_ranking = ranking[(page - 1) * per_page:page * per_page]
+    users = {user.id: user for user in User.query.filter(User.id.in_([user_id for user_id, _ in page_ranking]))}
+    return [(users[user_id], score) for user_id, score in page_ranking if user_id in users], len(ranking)
+
+def invalidate_job_embedding(job_description):
+    """
+    Drops the cached embedding of a job description that is no longer in use.
+
+    Entries are keyed by content, so jobs with the same description share one; it is
+    kept as long as any remaining job still has that description.
+
+    Args:
+        job_description (str): The description of the edited or deleted job.
+    """
+    if Job.query.with_entities(Job.id).filter(Job.description == job_description).first() is not None:
+        return
+    embedding_cache.invalidate(content_hash(preprocess_text(job_description)))
+    embedding_cache.invalidate(_chunk_key(job_description))
+
+def cache_job_embedding(job_description, previous_description=None):
+    """
+    Precomputes the embedding of a job description when a job is written.
+
+    Args:
+        job_description (str): The current job description.
+        previous_description (str): The description before an edit, whose entry is invalidated
+            unless another job still uses it.
+    """
+    if previous_description is not None and previous_description != job_description:
+        invalidate_job_embedding(previous_description)
+    get_cached_embedding(job_description)
+    if Config.SIMILARITY_MODE == 'chunked':
+        get_cached_chunk_embeddings(job_description)
+
 def compute_similarity(cv_text, job_description):
     """
     Computes the cosine similarity between the CV text and job description.
+    Both embeddings are served from the embedding cache when they were precomputed.
+
+    With SIMILARITY_MODE = 'chunked', both texts are split into overlapping chunks so
+    long CVs are not cut off at the model's input length, and the chunk similarities
+    are aggregated with CHUNK_AGGREGATE ('max' or 'mean_top_k').
 
     Args:
         cv_text (str): The text from the candidate's CV.
@@ -62,15 +385,14 @@ def compute_similarity(cv_text, job_description):
     Returns:
         float: The cosine similarity score between the CV and job description.
     """
-    cv_text = preprocess_text(cv_text)
-    job_description = preprocess_text(job_description)
+    if Config.SIMILARITY_MODE == 'chunked':
+        return max_sim(get_cached_chunk_embeddings(cv_text), get_cached_chunk_embeddings(job_description),
+                       Config.CHUNK_AGGREGATE, Config.CHUNK_TOP_K)
 
-    embeddings_cv = model.encode(cv_text, convert_to_tensor=True)
-    embeddings_job_desc = model.encode(job_description, convert_to_tensor=True)
+    embeddings_cv = get_cached_embedding(cv_text)
+    embeddings_job_desc = get_cached_embedding(job_description)
 
-    similarity_score = util.cos_sim(embeddings_cv, embeddings_job_desc)
-
-    return similarity_score.item()
+    return cosine_similarity(embeddings_cv, embeddings_job_desc)
 
 def evaluate_cv(cv_text, job_description, threshold = 0.5):
     """
@@ -89,22 +411,28 @@ def evaluate_cv(cv_text, job_description, threshold = 0.5):
 
     return similarity > threshold, similarity
 
-def generate_interview_questions(cv_text, job_description, max_retries=10):
+def question_prompt(cv_text, job_description, count=QUESTIONS_PER_INTERVIEW, existing_questions=()):
     """
-    Generates personalized interview questions based on the candidate's CV and the job description.
+    Builds the prompt asking for interview questions, optionally for a top-up of a partial set.
 
     Args:
         cv_text (str): The text from the candidate's CV.
         job_description (str): The text from the job description.
-        max_retries (int): The maximum number of retries if the API call fails.
+        count (int): The number of questions to ask for.
+        existing_questions (list): Questions already generated, which must not be repeated.
 
     Returns:
-        list: A list of generated interview questions or an error message.
+        str: The prompt.
     """
-    prompt = f"""Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
+    avoid = ""
+    if existing_questions:
+        listed = "\n".join(existing_questions)
+        avoid = f" The candidate has already been asked the following questions, don't repeat them:\n{listed}\n"
+
+    return f"""Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
 
 ### Instruction:
-Generate 10 personalized interview questions based on the candidate's experience and the job description provided. Don't add anything else, just give the 10 questions and don't repeat questions.
+Generate {count} personalized interview questions based on the candidate's experience and the job description provided. Don't add anything else, just give the {count} questions and don't repeat questions.{avoid}
 
 ### Input:
 Candidate's Resume:
@@ -115,51 +443,152 @@ Job Description:
 
 ### Response:
 """
-    data = {
-        "inputs": prompt,
-        "parameters": {
-            "max_new_tokens": 1000,
-            "temperature": 0.6,
-            "top_p": 0.9,
-            "do_sample": True
-        }
-    }
 
-    headers = {
-        "Authorization": f"Bearer {current_app.config['API_TOKEN']}",
-        "Content-Type": "application/json"
+def parse_questions(generated_text, existing_questions=()):
+    """
+    Extracts new, distinct questions from generated text.
+
+    Args:
+        generated_text (str): The text generated by the model, without the prompt.
+        existing_questions (list): Questions already kept, which are skipped.
+
+    Returns:
+        list: The new questions, in the order they were generated.
+    """
+    seen = {_question_key(question) for question in existing_questions}
+    questions = []
+    for line in generated_text.split("\n"):
+        line = line.strip()
+        key = _question_key(line)
+        if line.endswith('?') and key not in seen:
+            seen.add(key)
+            questions.append(line)
+    return questions
+
+def _question_key(question):
+    # Ignore numbering, case and punctuation when comparing questions
+    return re.sub(r'[^a-z0-9 ]', '', re.sub(r'^\s*\d+[.)]\s*', '', question.lower())).strip()
+
+def stream_questions(prompt, parameters, existing_questions, limit):
+    """
+    Streams a question generation and yields each question as soon as its line is complete.
+
+    Args:
+        prompt (str): The question generation prompt.
+        parameters (dict): The generation parameters.
+        existing_questions (list): Questions already kept, which are skipped.
+        limit (int): The maximum number of questions to yield.
+
+    Yields:
+        str: The next new question.
+
+    Raises:
+        LLMError: If the generation failed or the stream broke off.
+    """
+    # Count locally: the caller may append the yielded questions to existing_questions
+    kept = list(existing_questions)
+    yielded = 0
+    if limit <= 0:
+        return
+    buffer = ""
+    for chunk in llm_client.stream(prompt, parameters):
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for question in parse_questions("\n".join(lines), kept):
+            kept.append(question)
+            yielded += 1
+            yield question
+            if yielded >= limit:
+                # Stop reading, which closes the stream instead of paying for extra questions
+                return
+    for question in parse_questions(buffer, kept)[:limit - yielded]:
+        yield question
+
+def generate_interview_questions(cv_text, job_description, max_retries=10, on_question=None, stream=False):
+    """
+    Generates personalized interview questions based on the candidate's CV and the job description.
+
+    Question sets are cached by a hash of the CV, the job description and the generation
+    parameters. When a generation yields fewer than 10 valid questions, the valid ones are
+    kept and the next attempt only asks for the missing ones. If the attempts run out,
+    the questions kept so far are returned and the interview has that many; they were
+    possibly already shown to the candidate.
+
+    In streaming mode each question is passed to `on_question` as soon as the model has
+    finished writing it. If the stream fails, the questions received so far are kept and
+    the remaining attempts use regular requests.
+
+    Args:
+        cv_text (str): The text from the candidate's CV.
+        job_description (str): The text from the job description.
+        max_retries (int): The maximum number of generations if the output doesn't contain 10 questions.
+        on_question (callable): Called with each new question, in order.
+        stream (bool): Whether to stream the generation.
+
+    Returns:
+        list: The generated interview questions (fewer than 10 if some attempts failed), or an
+            error message if none could be generated.
+    """
+    on_question = on_question or (lambda question: None)
+    parameters = {
+        "max_new_tokens": 1000,
+        "temperature": 0.6,
+        "top_p": 0.9,
+        "do_sample": True
     }
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(current_app.config['API_URL'], headers=headers, data=json.dumps(data))
-            response.raise_for_status()
-            result = response.json()
-            logging.debug("API Response: %s", result)
-
-            # Extract questions from the generated text
-            generated_text = result[0].get('generated_text', '')
-            questions = [line.strip() for line in generated_text.split("\n") if line.strip().endswith('?')]
-            logging.debug("Generated Questions: %s", questions)
-
-            # Ensure exactly 10 questions are returned
-            if len(questions) == 10:
-                return questions
-            else:
-                logging.warning("Generated questions count is not 10. Attempt %d.", attempt + 1)
-
-        except (requests.exceptions.HTTPError, requests.exceptions.RequestException) as e:
-            # Exponential backoff for retries
-            wait_time = (2 ** attempt) + (0.1 * attempt)
-            logging.warning(f"Attempt {attempt + 1} failed. Retrying in {wait_time:.2f} seconds... Error: {e}")
-            time.sleep(wait_time)
-        except Exception as e:
-            logging.error(f"Unexpected error occurred: {e}")
-            break
+    cache_key = content_hash(json.dumps([cv_text, job_description, parameters, QUESTIONS_PER_INTERVIEW], sort_keys=True))
+    cached = question_cache.get(cache_key)
+    QUESTION_CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+    if cached is not None:
+        logging.info(f"Question cache hit (hit rate {question_cache.hit_rate:.0%})")
+        for question in cached:
+            on_question(question)
+        return list(cached)
 
+    questions = []
+    for attempt in range(max_retries):
+        missing = max(1, QUESTIONS_PER_INTERVIEW - len(questions))
+        prompt = question_prompt(cv_text, job_description, missing, questions)
+        if stream:
+            try:
+                for question in stream_questions(prompt, parameters, list(questions), missing):
+                    questions.append(question)
+                    on_question(question)
+            except LLMError as e:
+                logging.warning(f"Streaming question generation failed, falling back to regular requests: {e}")
+                stream = False
+        else:
+            try:
+                generated_text = llm_client.generate(prompt, parameters)
+            except LLMError as e:
+                logging.error(f"Could not generate questions: {e}")
+                break
+
+            # The API echoes the prompt, whose CV or question list may contain '?' lines
+            if generated_text.startswith(prompt):
+                generated_text = generated_text[len(prompt):]
+
+            # Keep valid questions from partial outputs and only ask for the rest next time
+            for question in parse_questions(generated_text, questions)[:missing]:
+                questions.append(question)
+                on_question(question)
+        logging.debug("Generated Questions: %s", questions)
+
+        if len(questions) >= QUESTIONS_PER_INTERVIEW:
+            question_cache.set(cache_key, tuple(questions))
+            return questions
+        else:
+            logging.warning("Generated questions count is %d, not %d. Attempt %d.",
+                            len(questions), QUESTIONS_PER_INTERVIEW, attempt + 1)
+
+    if questions:
+        # A partial set is still an interview; it is not cached so the next candidate gets a full one
+        logging.warning(f"Continuing with {len(questions)} of {QUESTIONS_PER_INTERVIEW} questions")
+        return questions
     return ["Error: Could not generate questions after multiple attempts."]
 
-def generate_feedback(question_text, response_text, job_description, max_retries=10):
+def generate_feedback(question_text, response_text, job_description, usage=None):
     """
     Generates feedback based on the candidate's response to an interview question, the question itself, and the job description, and generates a score out of 10 at the end.
 
@@ -167,7 +596,7 @@ def generate_feedback(question_text, response_text, job_description, max_retries
         question_text (str): The interview question asked to the candidate.
         response_text (str): The candidate's response to the interview question.
         job_description (str): The text from the job description.
-        max_retries (int): The maximum number of retries if the API call fails.
+        usage (LLMUsage): Accumulator for the calls and tokens spent.
 
     Returns:
         str: The generated feedback or an error message.
@@ -188,47 +617,153 @@ def generate_feedback(question_text, response_text, job_description, max_retries
 
     ### Feedback:
     """
-
-    data = {
-        "inputs": prompt,
-        "parameters": {
-            "max_new_tokens": 500,
-            "temperature": 0.6,
-            "top_p": 0.9,
-            "do_sample": True
-        }
+    parameters = {
+        "max_new_tokens": 500,
+        "temperature": 0.6,
+        "top_p": 0.9,
+        "do_sample": True
     }
 
-    headers = {
-        "Authorization": f"Bearer {current_app.config['API_TOKEN']}",
-        "Content-Type": "application/json"
+    try:
+        generated_text = llm_client.generate(prompt, parameters, usage)
+    except LLMError as e:
+        logging.error(f"Could not generate feedback: {e}")
+        return "Error: Could not generate feedback after multiple attempts."
+
+    # Extract feedback from the generated text
+    feedback_start = generated_text.find("### Feedback:") + len("### Feedback:")
+    feedback = generated_text[feedback_start:].strip()
+    logging.debug("Extracted Feedback: %s", feedback)
+
+    return feedback
+
+def generate_feedbacks_concurrently(question_responses, job_description, usage=None):
+    """
+    Generates feedback for several question/response pairs in parallel, with at most
+    LLM_MAX_CONCURRENCY calls in flight. Request pacing is left to the shared rate limiter.
+
+    Args:
+        question_responses (list): (question, response) pairs.
+        job_description (str): The text from the job description.
+        usage (LLMUsage): Accumulator for the calls and tokens spent.
+
+    Returns:
+        list: The generated feedbacks, in the same order as the input pairs.
+    """
+    app = current_app._get_current_object()
+
+    def run(question_response):
+        question, response = question_response
+        with app.app_context():
+            return generate_feedback(question, response, job_description, usage)
+
+    max_workers = max(1, min(app.config['LLM_MAX_CONCURRENCY'], len(question_responses)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, question_responses))
+
+def batched_feedback_prompt(question_responses, job_description):
+    """
+    Builds the prompt asking for feedback on several question/response pairs at once,
+    so the job description is only sent once.
+
+    Args:
+        question_responses (list): (question, response) pairs.
+        job_description (str): The text from the job description.
+
+    Returns:
+        str: The prompt.
+    """
+    pairs = "\n".join(
+        f"### Question {number}:\n{question}\n### Response {number}:\n{response}\n"
+        for number, (question, response) in enumerate(question_responses, start=1)
+    )
+    return f"""Below are interview questions, the candidate's responses, and the job description. For each of the {len(question_responses)} questions, provide concise, short and constructive feedback on the candidate's response, considering the job requirements and the context of the question. End every feedback with a score out of 10 formatted as 'Score: X/10'. Write exactly one section per question, in order, each starting with its own heading, like this:
+
+### Feedback 1:
+The candidate provided a well-thought-out response, addressing the key requirements of the job description effectively. However, they could improve on their technical knowledge. Score: 7/10
+
+### Job Description:
+{job_description}
+
+{pairs}
+### Feedbacks:
+"""
+
+def parse_batched_feedback(generated_text, count):
+    """
+    Splits the output of a batched feedback prompt into per-question feedbacks.
+
+    Sections are found by their 'Feedback N:' headings, tolerating missing '#', bold
+    markers and other separators. A section is only accepted if a score can be
+    extracted from it.
+
+    Args:
+        generated_text (str): The text generated by the model, without the prompt.
+        count (int): The number of questions in the prompt.
+
+    Returns:
+        list: The feedback of each question, or None where it is missing or has no score.
+    """
+    feedbacks = [None] * count
+    parts = re.split(r'^[ \t#*]*Feedback\s*(\d+)\s*\**\s*[:.)-]?\**', generated_text, flags=re.MULTILINE | re.IGNORECASE)
+    for number, body in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        body = body.strip().strip('#').strip()
+        if 0 <= index < count and feedbacks[index] is None and body and extract_score(body) is not None:
+            feedbacks[index] = body
+    return feedbacks
+
+def _generate_feedback_batch(question_responses, job_description, usage=None):
+    prompt = batched_feedback_prompt(question_responses, job_description)
+    parameters = {
+        "max_new_tokens": min(150 * len(question_responses) + 50, 2000),
+        "temperature": 0.6,
+        "top_p": 0.9,
+        "do_sample": True
     }
+    try:
+        generated_text = llm_client.generate(prompt, parameters, usage)
+    except LLMError as e:
+        logging.error(f"Could not generate batched feedback: {e}")
+        return [None] * len(question_responses)
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(current_app.config['API_URL'], headers=headers, data=json.dumps(data))
-            response.raise_for_status()
-            result = response.json()
-            logging.debug("API Feedback Response: %s", result)
-
-            # Extract feedback from the generated text
-            generated_text = result[0].get('generated_text', '')
-            feedback_start = generated_text.find("### Feedback:") + len("### Feedback:")
-            feedback = generated_text[feedback_start:].strip()
-            logging.debug("Extracted Feedback: %s", feedback)
-
-            return feedback
-
-        except (requests.exceptions.HTTPError, requests.exceptions.RequestException) as e:
-            # Exponential backoff for retries
-            wait_time = (2 ** attempt) + (0.1 * attempt)
-            logging.warning(f"Attempt {attempt + 1} failed. Retrying in {wait_time:.2f} seconds... Error: {e}")
-            time.sleep(wait_time)
-        except Exception as e:
-            logging.error(f"Unexpected error occurred: {e}")
-            break
-
-    return "Error: Could not generate feedback after multiple attempts."
+    if generated_text.startswith(prompt):
+        generated_text = generated_text[len(prompt):]
+    return parse_batched_feedback(generated_text, len(question_responses))
+
+def generate_feedbacks_batched(question_responses, job_description, batch_size=10, usage=None):
+    """
+    Generates feedback for a whole interview in one prompt per `batch_size` pairs.
+    Pairs whose feedback could not be parsed from the batched output are scored again
+    with one call each.
+
+    Args:
+        question_responses (list): (question, response) pairs.
+        job_description (str): The text from the job description.
+        batch_size (int): The maximum number of pairs per prompt.
+        usage (LLMUsage): Accumulator for the calls and tokens spent.
+
+    Returns:
+        list: The generated feedbacks, in the same order as the input pairs.
+    """
+    app = current_app._get_current_object()
+    batches = [question_responses[start:start + batch_size] for start in range(0, len(question_responses), batch_size)]
+
+    def run(batch):
+        with app.app_context():
+            return _generate_feedback_batch(batch, job_description, usage)
+
+    max_workers = max(1, min(app.config['LLM_MAX_CONCURRENCY'], len(batches)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        feedbacks = [feedback for batch_feedbacks in pool.map(run, batches) for feedback in batch_feedbacks]
+
+    missing = [index for index, feedback in enumerate(feedbacks) if feedback is None]
+    if missing:
+        logging.warning(f"Batched feedback unusable for {len(missing)} of {len(feedbacks)} responses, scoring them one by one.")
+        retried = generate_feedbacks_concurrently([question_responses[index] for index in missing], job_description, usage)
+        for index, feedback in zip(missing, retried):
+            feedbacks[index] = feedback
+    return feedbacks
 
 def convert_keys_to_strings(data):
     """
@@ -0,0 +1,360 @@
+import time
+import logging
+import threading
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Exact nearest-neighbour index over L2-normalised vectors.
+
+    Vectors are kept as rows of one contiguous matrix, so a top-k query is a single
+    matrix-vector product followed by a partial sort.
+    """
+
+    def __init__(self):
+        self._matrix = None
+        self._ids = []
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    def ids(self):
+        """
+        Lists the indexed ids.
+
+        Returns:
+            list: The ids of all indexed items.
+        """
+        with self._lock:
+            return list(self._ids)
+
+    def add(self, item_id, vector):
+        """
+        Adds a vector, replacing any existing vector with the same id.
+
+        Args:
+            item_id (int): The id of the indexed item.
+            vector (numpy.ndarray): The item's embedding.
+        """
+        vector = normalize(vector)
+        with self._lock:
+            if item_id in self._rows:
+                self._matrix[self._rows[item_id]] = vector
+                return
+            if self._matrix is None:
+                self._matrix = np.empty((16, vector.shape[0]), dtype=np.float32)
+            elif len(self._ids) == self._matrix.shape[0]:
+                # Grow geometrically so adds stay amortised O(1)
+                grown = np.empty((self._matrix.shape[0] * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+                self._matrix = grown
+            self._rows[item_id] = len(self._ids)
+            self._matrix[len(self._ids)] = vector
+            self._ids.append(item_id)
+
+    def remove(self, item_id):
+        """
+        Removes a vector by moving the last row into its slot.
+
+        Args:
+            item_id (int): The id of the indexed item.
+        """
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return
+            last_id = self._ids.pop()
+            if last_id != item_id:
+                self._matrix[row] = self._matrix[len(self._ids)]
+                self._ids[row] = last_id
+                self._rows[last_id] = row
+
+    def search(self, vector, k=10, exclude=None):
+        """
+        Finds the k most similar vectors.
+
+        Args:
+            vector (numpy.ndarray): The query embedding.
+            k (int): The number of results to return.
+            exclude (set): Ids that must not be returned.
+
+        Returns:
+            list: (id, cosine similarity) pairs, most similar first.
+        """
+        query = normalize(vector)
+        with self._lock:
+            if not self._ids:
+                return []
+            scores = self._matrix[:len(self._ids)] @ query
+            ids = list(self._ids)
+            for item_id in exclude or ():
+                row = self._rows.get(item_id)
+                if row is not None:
+                    scores[row] = -np.inf
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row], float(scores[row])) for row in top if np.isfinite(scores[row])]
+
+
+class HnswVectorIndex:
+    """
+    Approximate nearest-neighbour index backed by hnswlib, for very large job tables.
+    Exposes the same interface as VectorIndex.
+    """
+
+    def __init__(self, ef=64, m=16, initial_capacity=1024):
+        import hnswlib  # type: ignore
+        self._hnswlib = hnswlib
+        self._index = None
+        self._ef = ef
+        self._m = m
+        self._capacity = initial_capacity
+        self._ids = set()
+        self._deleted = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def ids(self):
+        with self._lock:
+            return list(self._ids)
+
+    def add(self, item_id, vector):
+        vector = normalize(vector)
+        with self._lock:
+            if self._index is None:
+                self._index = self._hnswlib.Index(space='ip', dim=vector.shape[0])
+                self._index.init_index(max_elements=self._capacity, ef_construction=200, M=self._m)
+                self._index.set_ef(self._ef)
+            if item_id in self._deleted:
+                self._index.unmark_deleted(item_id)
+                self._deleted.discard(item_id)
+            elif item_id not in self._ids and self._index.get_current_count() >= self._capacity:
+                self._capacity *= 2
+                self._index.resize_index(self._capacity)
+            self._index.add_items(vector[np.newaxis, :], [item_id])
+            self._ids.add(item_id)
+
+    def remove(self, item_id):
+        with self._lock:
+            if item_id in self._ids:
+                self._index.mark_deleted(item_id)
+                self._ids.discard(item_id)
+                self._deleted.add(item_id)
+
+    def search(self, vector, k=10, exclude=None):
+        exclude = exclude or set()
+        with self._lock:
+            if not self._ids:
+                return []
+            k = min(k + len(exclude), len(self._ids))
+            labels, distances = self._index.knn_query(normalize(vector)[np.newaxis, :], k=k)
+        # For the inner-product space hnswlib returns 1 - dot product
+        return [(int(label), 1.0 - float(distance))
+                for label, distance in zip(labels[0], distances[0]) if int(label) not in exclude]
+
+
+def normalize(vector):
+    """
+    Scales a vector to unit length so inner products are cosine similarities.
+
+    Args:
+        vector (numpy.ndarray): The vector to normalise.
+
+    Returns:
+        numpy.ndarray: The normalised float32 vector.
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def create_index(backend):
+    """
+    Builds an empty vector index for the configured backend, falling back to the exact
+    NumPy index when the ANN library is not installed.
+
+    Args:
+        backend (str): Either 'numpy' or 'hnswlib'.
+
+    Returns:
+        VectorIndex or HnswVectorIndex: The new index.
+    """
+    if backend == 'hnswlib':
+        try:
+            return HnswVectorIndex()
+        except ImportError:
+            logging.warning("hnswlib is not installed, falling back to the exact NumPy index.")
+    return VectorIndex()
+
+
+class SyncedIndex:
+    """
+    Vector index kept in sync with a database table.
+
+    Every worker process holds its own copy, so on top of any direct updates made by
+    the routes, the index re-syncs with the table every `refresh_interval` seconds.
+    Subclasses implement `_sync`.
+    """
+
+    def __init__(self, embed_fn, app=None):
+        self.embed_fn = embed_fn
+        self.backend = 'numpy'
+        self.refresh_interval = 30
+        self._index = None
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configures the index from the application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.backend = app.config['VECTOR_INDEX_BACKEND']
+        self.refresh_interval = app.config['VECTOR_INDEX_REFRESH_SECONDS']
+        self._index = None
+
+    def search(self, vector, k=10, exclude=None):
+        """
+        Finds the indexed rows most similar to a query embedding.
+
+        Args:
+            vector (numpy.ndarray): The query embedding.
+            k (int): The number of results to return.
+            exclude (set): Ids that must not be returned.
+
+        Returns:
+            list: (id, similarity) pairs, most similar first.
+        """
+        return self._ensure_synced().search(vector, k, exclude)
+
+    def __len__(self):
+        return len(self._ensure_synced())
+
+    def _ensure_synced(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._index is None:
+                self._index = self._new_index()
+                self._sync(self._index, full_build=True)
+                self._last_refresh = now
+            elif now - self._last_refresh >= self.refresh_interval:
+                self._sync(self._index, full_build=False)
+                self._last_refresh = now
+            return self._index
+
+    def _new_index(self):
+        return create_index(self.backend)
+
+    def _sync(self, index, full_build):
+        raise NotImplementedError
+
+
+class JobIndex(SyncedIndex):
+    """
+    Vector index over the embeddings of all job descriptions.
+    Incremental syncs only read jobs whose `updated_at` moved since the last sync.
+    """
+
+    def __init__(self, embed_fn, app=None):
+        self._synced_until = None
+        super().__init__(embed_fn, app)
+
+    def init_app(self, app):
+        super().init_app(app)
+        self._synced_until = None
+
+    def add(self, job):
+        """
+        Indexes a newly created or edited job.
+
+        Args:
+            job (Job): The job to index.
+        """
+        index = self._ensure_synced()
+        index.add(job.id, self.embed_fn([job.description])[0])
+
+    def remove(self, job_id):
+        """
+        Removes a deleted job from the index.
+
+        Args:
+            job_id (int): The id of the deleted job.
+        """
+        index = self._ensure_synced()
+        index.remove(job_id)
+
+    def _sync(self, index, full_build):
+        from .models import Job
+
+        query = Job.query.with_entities(Job.id, Job.description, Job.updated_at)
+        if not full_build and self._synced_until is not None:
+            # >= so that jobs written within the same timestamp are not missed
+            query = query.filter(Job.updated_at >= self._synced_until)
+        changed = query.all()
+        if changed:
+            vectors = self.embed_fn([description for _, description, _ in changed])
+            for (job_id, _, _), vector in zip(changed, vectors):
+                index.add(job_id, vector)
+            self._synced_until = max(updated_at for _, _, updated_at in changed)
+
+        if not full_build:
+            # Drop jobs deleted by other workers
+            live_ids = {job_id for (job_id,) in Job.query.with_entities(Job.id)}
+            for job_id in index.ids():
+                if job_id not in live_ids:
+                    index.remove(job_id)
+
+
+class CvIndex(SyncedIndex):
+    """
+    Vector index over the stored CV embeddings of all users.
+    Syncs compare `User.cv_hash` with the hashes already indexed and only load the text
+    of CVs that were uploaded or replaced since.
+    """
+
+    def __init__(self, embed_fn, app=None):
+        self._hashes = {}
+        super().__init__(embed_fn, app)
+
+    def init_app(self, app):
+        super().init_app(app)
+        self._hashes = {}
+
+    def _sync(self, index, full_build):
+        from .models import User
+
+        if full_build:
+            self._hashes = {}
+        current = dict(User.query.with_entities(User.id, User.cv_hash).filter(User.cv_hash.isnot(None)))
+
+        for user_id in [user_id for user_id in self._hashes if user_id not in current]:
+            index.remove(user_id)
+            del self._hashes[user_id]
+
+        changed = [user_id for user_id, cv_hash in current.items() if self._hashes.get(user_id) != cv_hash]
+        for start in range(0, len(changed), 500):
+            rows = User.query.with_entities(User.id, User.cv_text, User.cv_hash) \
+                .filter(User.id.in_(changed[start:start + 500]), User.cv_text.isnot(None)).all()
+            if not rows:
+                continue
+            vectors = self.embed_fn([cv_text for _, cv_text, _ in rows])
+            for (user_id, _, cv_hash), vector in zip(rows, vectors):
+                index.add(user_id, vector)
+                self._hashes[user_id] = cv_hash
@@ -0,0 +1,110 @@
+"""
+Accuracy and latency of chunked max-sim scoring against the single-vector score.
+
+Uses the PDFs in testing_resumes/. Each CV is split in half. The second half, which a
+single vector truncated at the model's input length does not see, becomes a job-like
+query for that CV. Every query is then scored against every CV's full text, and the
+benchmark reports how often the right CV ranks first (top-1) and its mean reciprocal
+rank for each scoring mode. Pass --jobs with a JSON file of {"job": ..., "cv": <file name>}
+pairs to evaluate real job descriptions instead.
+
+Encoding latency is measured per CV with an empty cache; scoring latency with warm
+vectors. Needs the sentence-transformers model, but no database or network.
+
+Run from the project root:
+    python -m benchmarks.chunked_similarity --dir testing_resumes
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import numpy as np
+
+from app.chunking import chunk_text, max_sim
+from app.embeddings import cosine_similarity
+from app.utils import extract_cv_text, get_model, preprocess_text
+
+
+def make_queries(cvs, jobs_file):
+    """
+    Builds the (query, expected CV) pairs.
+
+    Args:
+        cvs (dict): CV text by file name.
+        jobs_file (str): Optional JSON file of {"job", "cv"} pairs.
+
+    Returns:
+        list: (query text, expected CV file name) pairs.
+    """
+    if jobs_file:
+        with open(jobs_file) as f:
+            return [(pair['job'], pair['cv']) for pair in json.load(f)]
+    queries = []
+    for name, text in cvs.items():
+        lines = text.splitlines()
+        queries.append(('\n'.join(lines[len(lines) // 2:]), name))
+    return queries
+
+
+def rank_metrics(scores, queries, names):
+    top1, reciprocal_ranks = 0, []
+    for row, (_, expected) in enumerate(queries):
+        order = np.argsort(-scores[row])
+        rank = [names[i] for i in order].index(expected) + 1
+        top1 += rank == 1
+        reciprocal_ranks.append(1 / rank)
+    return top1 / len(queries), statistics.mean(reciprocal_ranks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default='testing_resumes')
+    parser.add_argument('--jobs', default=None)
+    parser.add_argument('--chunk-words', type=int, default=200)
+    parser.add_argument('--overlap', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=3)
+    args = parser.parse_args()
+
+    cvs = {name: extract_cv_text(os.path.join(args.dir, name))
+           for name in sorted(os.listdir(args.dir)) if name.lower().endswith('.pdf')}
+    names = list(cvs)
+    queries = make_queries(cvs, args.jobs)
+    model = get_model()
+    model.encode(['warm up'])
+    print(f"{len(cvs)} CVs, {len(queries)} queries, model max_seq_length {model.max_seq_length}")
+
+    for name, text in cvs.items():
+        chunks = chunk_text(text, args.chunk_words, args.overlap)
+        words = len(text.split())
+        print(f"  {name:<40} {words:5d} words, {len(chunks)} chunks")
+
+    # Single vector, as compute_similarity does today
+    start = time.perf_counter()
+    single_cv = [model.encode(preprocess_text(text)) for text in cvs.values()]
+    single_encode = (time.perf_counter() - start) / len(cvs)
+    single_query = [model.encode(preprocess_text(query)) for query, _ in queries]
+    start = time.perf_counter()
+    single = np.array([[cosine_similarity(q, c) for c in single_cv] for q in single_query])
+    single_score = (time.perf_counter() - start) / single.size
+
+    # Chunked
+    start = time.perf_counter()
+    chunked_cv = [model.encode(chunk_text(text, args.chunk_words, args.overlap) or [text]) for text in cvs.values()]
+    chunked_encode = (time.perf_counter() - start) / len(cvs)
+    chunked_query = [model.encode(chunk_text(query, args.chunk_words, args.overlap) or [query]) for query, _ in queries]
+
+    results = {'single': (single, single_encode, single_score)}
+    for aggregate in ('max', 'mean_top_k'):
+        start = time.perf_counter()
+        scores = np.array([[max_sim(c, q, aggregate, args.top_k) for c in chunked_cv] for q in chunked_query])
+        results[f"chunked {aggregate}"] = (scores, chunked_encode, (time.perf_counter() - start) / scores.size)
+
+    print(f"\n{'mode':<20} {'top-1':>6} {'MRR':>6} {'encode/CV':>11} {'score/pair':>11}")
+    for mode, (scores, encode_seconds, score_seconds) in results.items():
+        top1, mrr = rank_metrics(scores, queries, names)
+        print(f"{mode:<20} {top1:6.2f} {mrr:6.3f} {encode_seconds * 1000:8.1f} ms {score_seconds * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
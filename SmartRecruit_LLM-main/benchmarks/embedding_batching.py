@@ -0,0 +1,77 @@
+"""
+Compares embedding throughput of one-at-a-time encodes against the micro-batching service.
+
+Run from the project root:
+    python -m benchmarks.embedding_batching --threads 16 --requests 256
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.embeddings import EmbeddingBatcher
+from app.utils import get_model, preprocess_text
+
+
+def sample_texts(count):
+    """
+    Builds distinct CV-sized texts so no two requests are identical.
+
+    Args:
+        count (int): The number of texts to build.
+
+    Returns:
+        list: The sample texts.
+    """
+    base = ("Software engineer with experience in Python, Flask, SQL databases, REST APIs, "
+            "machine learning pipelines and cloud deployments. Led a team of developers ")
+    return [preprocess_text(f"{base} project number {i} in {i % 17} countries") for i in range(count)]
+
+
+def run(encode, texts, threads):
+    """
+    Encodes every text from a pool of concurrent callers.
+
+    Args:
+        encode (callable): Function encoding a single text.
+        texts (list): The texts to encode.
+        threads (int): The number of concurrent callers.
+
+    Returns:
+        float: The achieved requests per second.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(encode, texts))
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    model = get_model()
+    texts = sample_texts(args.requests)
+    model.encode(texts[:2])  # warm up
+
+    batcher = EmbeddingBatcher(lambda batch: model.encode(batch, batch_size=len(batch)))
+    batcher.enabled = True
+    batcher.max_batch_size = args.batch_size
+    batcher.max_wait = args.wait_ms / 1000
+
+    single = run(lambda text: model.encode(text), texts, args.threads)
+    batched = run(batcher.encode, texts, args.threads)
+
+    print(f"CPU count:        {os.cpu_count()}")
+    print(f"Concurrent calls: {args.threads}, requests: {args.requests}")
+    print(f"One-at-a-time:    {single:8.1f} req/s")
+    print(f"Micro-batched:    {batched:8.1f} req/s  (batch<={args.batch_size}, wait<={args.wait_ms}ms)")
+    print(f"Speed-up:         {batched / single:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Encode latency, throughput and memory of each encoder backend.
+
+Every backend runs in a fresh interpreter so its memory is measured on its own: the
+resident set size added by loading the model, and the peak after encoding. Latency is
+that of encoding one CV-sized text (the interactive path); throughput is texts per
+second when encoding batches of --batch-size (the bulk path, e.g. `flask ingest-cvs
+--embed`). Texts are the CVs in testing_resumes/ repeated to --texts.
+
+Run from the project root:
+    python -m benchmarks.encoder_backends --backends torch torch-int8 onnx onnx-int8
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend, directory, texts, runs, batch_size, threads):
+    """
+    Loads one backend and times it. Runs in the child interpreter.
+
+    Returns:
+        dict: The measurements.
+    """
+    if threads:
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+    from app.config import Config
+    from app.encoders import create_encoder
+    from app.utils import extract_cv_text, preprocess_text
+
+    cvs = [preprocess_text(extract_cv_text(os.path.join(directory, name)))
+           for name in sorted(os.listdir(directory)) if name.lower().endswith('.pdf')]
+    corpus = (cvs * (texts // len(cvs) + 1))[:texts]
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    encoder = create_encoder(backend, Config.MODEL_NAME, Config.ENCODER_ONNX_DIR)
+    load_seconds = time.perf_counter() - start
+    loaded = rss_mb()
+    encoder.encode(['warm up'])
+
+    latencies = []
+    for run in range(runs):
+        start = time.perf_counter()
+        encoder.encode(cvs[run % len(cvs)])
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), batch_size):
+        encoder.encode(corpus[offset:offset + batch_size], batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'backend': encoder.name,
+        'load_seconds': load_seconds,
+        'model_mb': loaded - baseline,
+        'peak_mb': peak_rss_mb(),
+        'latency_p50_ms': statistics.median(latencies) * 1000,
+        'latency_p95_ms': sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000,
+        'texts_per_second': len(corpus) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs='+', default=['torch', 'torch-int8', 'onnx', 'onnx-int8'])
+    parser.add_argument('--dir', default='testing_resumes')
+    parser.add_argument('--texts', type=int, default=256)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=0, help='Intra-op threads, 0 for the library default.')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.dir, args.texts, args.runs, args.batch_size, args.threads)))
+        return
+
+    print(f"{args.texts} texts, batches of {args.batch_size}, {args.runs} single-text runs")
+    print(f"{'backend':<11} {'load':>7} {'model':>9} {'peak':>9} {'p50':>9} {'p95':>9} {'throughput':>13}")
+    for backend in args.backends:
+        command = [sys.executable, '-m', 'benchmarks.encoder_backends', '--child', backend, '--dir', args.dir,
+                   '--texts', str(args.texts), '--runs', str(args.runs), '--batch-size', str(args.batch_size),
+                   '--threads', str(args.threads)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if result['backend'] != backend:
+            print(f"{backend:<11} SKIPPED (dependencies not installed)")
+            continue
+        print(f"{backend:<11} {result['load_seconds']:6.1f}s {result['model_mb']:6.0f} MB {result['peak_mb']:6.0f} MB "
+              f"{result['latency_p50_ms']:6.1f} ms {result['latency_p95_ms']:6.1f} ms "
+              f"{result['texts_per_second']:7.1f} text/s")
+
+
+if __name__ == '__main__':
+    main()
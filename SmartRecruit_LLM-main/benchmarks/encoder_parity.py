@@ -0,0 +1,80 @@
+"""
+Checks that the quantized and ONNX encoder backends score CVs like the torch model.
+
+Scores every CV in testing_resumes/ against a set of job descriptions (built-in, plus
+the second half of each CV as in benchmarks/chunked_similarity.py) with each backend,
+the same way compute_similarity does in single-vector mode. Reports the largest
+absolute difference from the torch scores and whether every job ranks the CVs in the
+same order. Exits with status 1 if a backend drifts more than --tolerance, so it can
+gate a change of ENCODER_BACKEND in CI.
+
+Run from the project root:
+    python -m benchmarks.encoder_parity --backends torch-int8 onnx onnx-int8 --tolerance 0.02
+"""
+import argparse
+import os
+import sys
+import numpy as np
+
+from app.config import Config
+from app.embeddings import cosine_similarity
+from app.encoders import BACKENDS, create_encoder
+from app.utils import extract_cv_text, preprocess_text
+
+JOB_DESCRIPTIONS = [
+    "Backend engineer to build Python services and REST APIs with Flask, PostgreSQL and Docker.",
+    "Data scientist with experience in machine learning, statistics, pandas and model deployment.",
+    "Frontend developer skilled in React, TypeScript, CSS and accessible user interface design.",
+    "Project manager to lead cross-functional teams, plan releases and report to stakeholders.",
+    "DevOps engineer to run Kubernetes clusters, CI/CD pipelines, monitoring and cloud infrastructure.",
+]
+
+
+def similarity_matrix(encoder, jobs, cvs):
+    """
+    Scores every CV against every job.
+
+    Args:
+        encoder: The encoder to use.
+        jobs (list): The job description texts.
+        cvs (list): The CV texts.
+
+    Returns:
+        numpy.ndarray: The scores, one row per job.
+    """
+    job_vectors = encoder.encode([preprocess_text(text) for text in jobs])
+    cv_vectors = encoder.encode([preprocess_text(text) for text in cvs])
+    return np.array([[cosine_similarity(job, cv) for cv in cv_vectors] for job in job_vectors])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default='testing_resumes')
+    parser.add_argument('--backends', nargs='+', default=[b for b in BACKENDS if b != 'torch'], choices=BACKENDS)
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    args = parser.parse_args()
+
+    cvs = [extract_cv_text(os.path.join(args.dir, name))
+           for name in sorted(os.listdir(args.dir)) if name.lower().endswith('.pdf')]
+    jobs = JOB_DESCRIPTIONS + ['\n'.join(text.splitlines()[len(text.splitlines()) // 2:]) for text in cvs]
+    print(f"{len(cvs)} CVs x {len(jobs)} jobs, tolerance {args.tolerance}")
+
+    reference = similarity_matrix(create_encoder('torch', Config.MODEL_NAME, Config.ENCODER_ONNX_DIR), jobs, cvs)
+    failed = False
+    for backend in args.backends:
+        encoder = create_encoder(backend, Config.MODEL_NAME, Config.ENCODER_ONNX_DIR)
+        if encoder.name != backend:
+            print(f"{backend:<11} SKIPPED (dependencies not installed)")
+            continue
+        scores = similarity_matrix(encoder, jobs, cvs)
+        drift = np.abs(scores - reference)
+        same_ranking = all((np.argsort(-scores[row]) == np.argsort(-reference[row])).all() for row in range(len(jobs)))
+        ok = drift.max() <= args.tolerance
+        failed = failed or not ok
+        print(f"{backend:<11} max |diff| {drift.max():.4f}   mean |diff| {drift.mean():.4f}   "
+              f"same ranking {'yes' if same_ranking else 'no'}   {'OK' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares per-question and batched feedback scoring of one interview.
+
+Starts the stub inference API, scores the same 10 question/response pairs in both
+modes and reports the calls, estimated prompt and completion tokens and wall time of
+each. Pass --api-url to measure against a real inference endpoint instead.
+
+Run from the project root:
+    python -m benchmarks.feedback_modes --latency-ms 300 --token-ms 5 --runs 5
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.stub_llm import start_stub_server
+
+JOB_DESCRIPTION = ("We are looking for a backend engineer to design, build and operate the Python services behind "
+                   "our recruiting platform. You will own REST APIs written in Flask, model data in PostgreSQL and "
+                   "MongoDB, run background jobs, and work with the ML team to ship LLM-powered features. "
+                   "Experience with Docker, CI pipelines, observability and mentoring junior engineers is a plus. ") * 3
+QUESTION_RESPONSES = [
+    (f"{number}. Can you describe a project where you used skill number {number} in production?",
+     f"In my last role I used skill {number} to rebuild a service that handled about {number * 100} requests per "
+     "second. I profiled the hot paths, added caching and wrote integration tests before rolling it out.")
+    for number in range(1, 11)
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--api-url', default=None)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--token-ms', type=float, default=5)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.api_url is None:
+        server = start_stub_server(latency=args.latency_ms / 1000, token_latency=args.token_ms / 1000)
+        args.api_url = f"http://127.0.0.1:{server.server_port}/"
+    os.environ['API_URL'] = args.api_url
+
+    from app import create_app
+    from app.llm import LLMUsage
+    from app.utils import generate_feedbacks_batched, generate_feedbacks_concurrently, extract_score
+
+    app = create_app()
+    modes = {
+        'per_question': lambda usage: generate_feedbacks_concurrently(QUESTION_RESPONSES, JOB_DESCRIPTION, usage),
+        'batched': lambda usage: generate_feedbacks_batched(QUESTION_RESPONSES, JOB_DESCRIPTION,
+                                                            app.config['FEEDBACK_BATCH_SIZE'], usage),
+    }
+    print(f"{len(QUESTION_RESPONSES)} responses per application, {args.runs} runs, API {args.api_url}")
+    with app.app_context():
+        for mode, score in modes.items():
+            usages, scored = [], 0
+            for _ in range(args.runs):
+                usage = LLMUsage()
+                start = time.perf_counter()
+                feedbacks = score(usage)
+                usages.append(dict(usage.as_dict(), wall_seconds=time.perf_counter() - start))
+                scored += sum(extract_score(feedback) is not None for feedback in feedbacks)
+            print(f"{mode:<13} calls {statistics.mean(u['calls'] for u in usages):5.1f}   "
+                  f"prompt tokens {statistics.mean(u['prompt_tokens'] for u in usages):7.0f}   "
+                  f"completion tokens {statistics.mean(u['completion_tokens'] for u in usages):6.0f}   "
+                  f"latency {statistics.mean(u['wall_seconds'] for u in usages):6.2f} s   "
+                  f"scored {scored}/{len(QUESTION_RESPONSES) * args.runs}")
+
+
+if __name__ == '__main__':
+    main()
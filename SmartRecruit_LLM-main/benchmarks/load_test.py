@@ -0,0 +1,390 @@
+"""
+End-to-end load test of the candidate and recruiter flows.
+
+Boots the app on a local threaded WSGI server against the stub inference API
+(benchmarks/stub_llm.py), the in-memory MongoDB stand-in and a temporary SQLite
+database, then runs simulated users concurrently over HTTP:
+
+- candidates sign in, apply to a job matching their CV (one of the PDFs in
+  testing_resumes/), wait on the loading page like the browser does, answer the
+  interview questions as they become available, submit and open their applications;
+- recruiters keep loading the dashboard, its job data and the candidate list of one
+  of their jobs until every candidate is done.
+
+Reports, per route, the request count, throughput, p50/p95/p99 latency and errors; the
+duration of a whole candidate flow; and saturation, sampled every 100 ms: requests in
+flight on the server, and the task queue backlog and busy task workers. With
+--max-p95 ROUTE=MS (repeatable) or --max-error-rate it exits with status 1 when a
+threshold is exceeded, so it can gate changes to these routes.
+
+Needs the sentence-transformers model and mongomock (or --mongo-uri), but no network.
+
+Run from the project root:
+    python -m benchmarks.load_test --candidates 20 --recruiters 4 --latency-ms 300 --error-rate 0.05
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+from benchmarks.stub_llm import start_stub_server
+
+PASSWORD = 'load-test'
+ANSWER = ("In my last role I owned this area end to end: I gathered requirements, designed the solution, "
+          "shipped it behind a feature flag and measured the impact with the team.")
+
+
+def route_label(method, path):
+    # One series per route, not per job or task
+    path = re.sub(r'/[0-9a-f]{8}-[0-9a-f-]{27}', '/<task_id>', path.split('?')[0])
+    path = re.sub(r'/\d+', '/<id>', path)
+    return f"{method} {path}"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class Recorder:
+    """
+    Collects the latency and outcome of every request, per route.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.flows = []
+        self.failed_flows = 0
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(route, []).append((seconds, ok))
+
+    def flow(self, seconds):
+        with self._lock:
+            if seconds is None:
+                self.failed_flows += 1
+            else:
+                self.flows.append(seconds)
+
+
+class InFlight:
+    """
+    WSGI middleware counting the requests being served.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.current = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.current += 1
+        try:
+            return self.app(environ, start_response)
+        finally:
+            with self._lock:
+                self.current -= 1
+
+
+class Client:
+    """
+    A signed-in simulated user.
+    """
+
+    def __init__(self, base_url, recorder, timeout):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def request(self, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, allow_redirects=False,
+                                            timeout=self.timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self.recorder.record(route_label(method, path), time.perf_counter() - start, False)
+            raise
+        self.recorder.record(route_label(method, path), time.perf_counter() - start, response.status_code < 400)
+        return response
+
+    def sign_in(self, email):
+        response = self.request('POST', '/sign', data={'action': 'signin', 'email': email, 'password': PASSWORD})
+        if response.status_code != 302 or response.headers['Location'].rstrip('/').endswith('/sign'):
+            raise RuntimeError(f"Could not sign in {email}")
+
+    def follow_loading_page(self, response, poll_seconds):
+        """
+        Polls the task of a loading page like its script does, then opens the next page.
+
+        Args:
+            response (Response): The loading page.
+            poll_seconds (float): The first polling delay.
+
+        Returns:
+            Response: The next page.
+        """
+        status_url = re.search(r'fetch\("([^"]+)"\)', response.text).group(1)
+        next_url = re.search(r'window\.location\.href = "([^"]+)"', response.text).group(1)
+        ready_at = re.search(r'const ready = ([^;]+);', response.text).group(1)
+        ready_at = None if ready_at == 'null' else int(ready_at)
+        delay = poll_seconds
+        while True:
+            task = self.request('GET', status_url).json()
+            if task['status'] in ('done', 'failed') or (ready_at is not None and (task['progress'] or 0) >= ready_at):
+                return self.request('GET', next_url)
+            time.sleep(delay)
+            delay = min(delay * 1.5, 5.0)
+
+
+def run_candidate(base_url, recorder, email, job_id, args):
+    """
+    Runs one candidate through apply, the interview and the submission.
+
+    Returns:
+        float: The duration of the flow, or None if it failed.
+    """
+    client = Client(base_url, recorder, args.timeout)
+    poll = args.poll_ms / 1000
+    start = time.perf_counter()
+    try:
+        client.sign_in(email)
+        response = client.request('GET', f'/apply/{job_id}')
+        if response.status_code != 200 or 'fetch(' not in response.text:
+            raise RuntimeError(f"{email} could not apply to job {job_id}")
+        response = client.follow_loading_page(response, poll)
+
+        while response.status_code == 200:
+            if 'name="response"' in response.text:
+                time.sleep(args.think_ms / 1000)
+                response = client.request('POST', '/interview_questions', data={'response': ANSWER})
+            else:
+                response = client.follow_loading_page(response, poll)
+        if not response.headers.get('Location', '').endswith('/review_responses'):
+            raise RuntimeError(f"{email} was sent to {response.headers.get('Location')} during the interview")
+
+        response = client.follow_loading_page(client.request('GET', '/review_responses'), poll)
+        if not response.headers.get('Location', '').endswith('/view_applications'):
+            raise RuntimeError(f"{email} could not submit the application")
+        client.request('GET', '/view_applications')
+    except (RuntimeError, AttributeError, ValueError, requests.exceptions.RequestException) as e:
+        print(f"  candidate flow failed: {e}", file=sys.stderr)
+        return None
+    return time.perf_counter() - start
+
+
+def run_recruiter(base_url, recorder, email, job_ids, stop, args):
+    """
+    Keeps a recruiter browsing the dashboard and candidate lists until `stop` is set.
+    """
+    client = Client(base_url, recorder, args.timeout)
+    client.sign_in(email)
+    turn = 0
+    while not stop.is_set():
+        job_id = job_ids[turn % len(job_ids)]
+        for path in ('/dashboard', f'/get_job_data/{job_id}', f'/view_candidates/{job_id}'):
+            try:
+                client.request('GET', path)
+            except requests.exceptions.RequestException:
+                pass
+        turn += 1
+        stop.wait(args.think_ms / 1000)
+
+
+def sample_saturation(app, server_load, stop, samples):
+    """
+    Samples the requests in flight, the task queue backlog and the busy task workers.
+    """
+    from app.models import Task
+    from app.tasks import task_queue
+
+    with app.app_context():
+        while not stop.wait(0.1):
+            executor = task_queue._executor
+            queued = executor._work_queue.qsize() if executor is not None else 0
+            running = Task.query.filter_by(status='running').count()
+            samples.append((server_load.current, queued, running))
+
+
+def seed(app, args, upload_dir):
+    """
+    Creates the recruiters, the candidates with their CVs and one matching job per candidate.
+
+    Returns:
+        tuple: (candidate (email, job id) pairs, recruiter email -> job ids).
+    """
+    from app import db
+    from app.ingest import cv_ingestor
+    from app.models import User, Job
+    from app.utils import file_hash
+
+    resumes = sorted(name for name in os.listdir(args.dir) if name.lower().endswith('.pdf'))
+    texts = {}
+    for name in resumes:
+        path = os.path.join(args.dir, name)
+        cv_hash = file_hash(path)
+        texts[name] = (cv_hash, cv_ingestor.extract_text(path, cv_hash))
+
+    def make_user(email, **fields):
+        return User(first_name=email.split('@')[0], last_name='Load', company_name='Load Co', email=email,
+                    phone_number='0600000000', birthday='1990-01-01', password=PASSWORD, **fields)
+
+    with app.app_context():
+        recruiters = [make_user(f'recruiter{i}@example.com') for i in range(args.recruiters)]
+        candidates = []
+        for i in range(args.candidates):
+            name = resumes[i % len(resumes)]
+            cv_file = f'candidate{i}.pdf'
+            shutil.copy(os.path.join(args.dir, name), os.path.join(upload_dir, cv_file))
+            cv_hash, text = texts[name]
+            candidates.append(make_user(f'candidate{i}@example.com', cv_file=cv_file, cv_hash=cv_hash, cv_text=text))
+        db.session.add_all(recruiters + candidates)
+        db.session.flush()
+
+        # The job is written from the candidate's CV, so the similarity check always passes
+        jobs = [Job(title=f'Role {i}', location='Remote', salary='1000', user_id=recruiters[i % len(recruiters)].id,
+                    description=f"Role {i}\n\n{candidate.cv_text}") for i, candidate in enumerate(candidates)]
+        db.session.add_all(jobs)
+        db.session.commit()
+
+        pairs = [(candidate.email, job.id) for candidate, job in zip(candidates, jobs)]
+        jobs_by_recruiter = {recruiter.email: [job.id for job in jobs if job.user_id == recruiter.id]
+                             for recruiter in recruiters}
+    return pairs, jobs_by_recruiter
+
+
+def report(recorder, elapsed, samples, task_workers):
+    print(f"\n{'route':<34} {'requests':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    p95s, errors, total = {}, 0, 0
+    for route, samples_of_route in sorted(recorder.samples.items()):
+        latencies = [seconds * 1000 for seconds, _ in samples_of_route]
+        failed = sum(not ok for _, ok in samples_of_route)
+        errors += failed
+        total += len(samples_of_route)
+        p95s[route] = percentile(latencies, 0.95)
+        print(f"{route:<34} {len(latencies):8d} {len(latencies) / elapsed:7.1f} {percentile(latencies, 0.5):8.1f} "
+              f"{p95s[route]:8.1f} {percentile(latencies, 0.99):8.1f} {failed:7d}")
+
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), {errors} errors")
+    if recorder.flows:
+        print(f"candidate flows: {len(recorder.flows)} done, {recorder.failed_flows} failed, "
+              f"p50 {statistics.median(recorder.flows):.1f}s, p95 {percentile(recorder.flows, 0.95):.1f}s, "
+              f"{len(recorder.flows) / elapsed * 60:.1f} applications/min")
+    if samples:
+        in_flight = [s[0] for s in samples]
+        queued = [s[1] for s in samples]
+        busy = [s[2] for s in samples]
+        print(f"requests in flight: mean {statistics.mean(in_flight):.1f}, max {max(in_flight)}")
+        print(f"task queue backlog: mean {statistics.mean(queued):.1f}, max {max(queued)}; "
+              f"task workers busy: mean {statistics.mean(busy) / task_workers:.0%}, "
+              f"saturated {sum(b >= task_workers for b in busy) / len(busy):.0%} of the time")
+    return p95s, errors / total if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidates', type=int, default=20)
+    parser.add_argument('--recruiters', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=10, help='Candidates running at the same time.')
+    parser.add_argument('--dir', default='testing_resumes')
+    parser.add_argument('--latency-ms', type=float, default=300, help='Stub LLM latency per request.')
+    parser.add_argument('--token-ms', type=float, default=5, help='Stub LLM latency per generated word.')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Share of stub LLM requests answered with a 503.')
+    parser.add_argument('--llm-rate', type=float, default=50, help='LLM_RATE_LIMIT of the app, in calls per second.')
+    parser.add_argument('--think-ms', type=float, default=200, help='Pause of a user between two actions.')
+    parser.add_argument('--poll-ms', type=float, default=500, help='First polling delay of the loading pages.')
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--mongo-uri', default='mongomock://localhost/applications')
+    parser.add_argument('--max-p95', action='append', default=[], metavar='ROUTE=MS',
+                        help="Fail if a route's p95 exceeds MS milliseconds, e.g. 'GET /apply/<id>=2000'.")
+    parser.add_argument('--max-error-rate', type=float, default=None)
+    args = parser.parse_args()
+
+    stub = start_stub_server(latency=args.latency_ms / 1000, error_rate=args.error_rate,
+                             token_latency=args.token_ms / 1000)
+    scratch = tempfile.mkdtemp(prefix='smarthire-loadtest-')
+    os.environ.update({
+        'API_URL': f"http://127.0.0.1:{stub.server_port}/",
+        'DATABASE_URL': f"sqlite:///{os.path.join(scratch, 'site.db')}",
+        'MONGO_URI': args.mongo_uri,
+        'INTERVIEW_STORE_URL': f"sqlite:///{os.path.join(scratch, 'interviews.db')}",
+        'EMBEDDING_CACHE_DIR': os.path.join(scratch, 'embeddings'),
+        'INGEST_CACHE_DIR': os.path.join(scratch, 'cv_text'),
+        'LLM_RATE_LIMIT': str(args.llm_rate),
+        'LLM_RATE_BURST': str(max(1, int(args.llm_rate))),
+        'LLM_BACKOFF_BASE': '0.1',
+        'LOG_LEVEL': 'WARNING',
+    })
+
+    from werkzeug.serving import make_server
+    from app import create_app, db
+    from app.utils import warm_up_model
+
+    app = create_app()
+    upload_dir = os.path.join(scratch, 'cv')
+    os.makedirs(upload_dir)
+    app.config['UPLOAD_FOLDER_CV'] = upload_dir
+    with app.app_context():
+        db.create_all()
+    pairs, jobs_by_recruiter = seed(app, args, upload_dir)
+    warm_up_model()
+
+    server_load = InFlight(app)
+    server = make_server('127.0.0.1', 0, server_load, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{args.candidates} candidates ({args.concurrency} at a time), {args.recruiters} recruiters, "
+          f"stub LLM {args.latency_ms:.0f} ms + {args.token_ms:.0f} ms/word, {args.error_rate:.0%} errors, "
+          f"{app.config['TASK_WORKERS']} task workers")
+
+    recorder = Recorder()
+    stop, samples = threading.Event(), []
+    background = [threading.Thread(target=sample_saturation, args=(app, server_load, stop, samples), daemon=True)]
+    background += [threading.Thread(target=run_recruiter, args=(base_url, recorder, email, job_ids, stop, args),
+                                    daemon=True) for email, job_ids in jobs_by_recruiter.items() if job_ids]
+    start = time.perf_counter()
+    try:
+        for thread in background:
+            thread.start()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for duration in pool.map(lambda pair: run_candidate(base_url, recorder, *pair, args), pairs):
+                recorder.flow(duration)
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for thread in background:
+            thread.join(timeout=5)
+        server.shutdown()
+        stub.shutdown()
+
+    p95s, error_rate = report(recorder, elapsed, samples, app.config['TASK_WORKERS'])
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    failures = []
+    for threshold in args.max_p95:
+        route, limit = threshold.rsplit('=', 1)
+        if route not in p95s:
+            failures.append(f"{route}: no requests")
+        elif p95s[route] > float(limit):
+            failures.append(f"{route}: p95 {p95s[route]:.0f} ms > {float(limit):.0f} ms")
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        failures.append(f"error rate {error_rate:.1%} > {args.max_error_rate:.1%}")
+    if recorder.failed_flows:
+        failures.append(f"{recorder.failed_flows} candidate flows failed")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
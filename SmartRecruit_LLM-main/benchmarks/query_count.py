@@ -0,0 +1,188 @@
+"""
+Query-count harness for the recruiter and candidate listing endpoints.
+
+Seeds a temporary SQLite database and a scratch MongoDB database with jobs that have
+an increasing number of applicants, requests each endpoint, and counts the SQL
+statements and MongoDB commands it issues. Exits non-zero if any count grows with
+the number of applicants.
+
+Runs on the in-memory MongoDB stand-in (requires mongomock) by default, so it needs
+no external services; set MONGO_URI to count against a real server (the scratch
+database is dropped).
+
+Run from the project root:
+    python -m benchmarks.query_count --sizes 1 10 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pymongo import monitoring
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix='smarthire-querycount-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(SCRATCH_DIR, 'site.db')}")
+os.environ.setdefault('MONGO_URI', 'mongomock://localhost/smarthire_query_count')
+os.environ.setdefault('EMBEDDING_CACHE_DIR', os.path.join(SCRATCH_DIR, 'embeddings'))
+
+
+class MongoCommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ('find', 'aggregate', 'count', 'getMore', 'insert', 'update', 'delete'):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Collection methods of mongomock that would each send a command to a server
+MONGOMOCK_COMMANDS = ('find', 'find_one', 'aggregate', 'count_documents', 'insert_one', 'insert_many',
+                      'update_one', 'update_many', 'replace_one', 'delete_one', 'delete_many', 'bulk_write')
+
+
+def count_mongomock_calls(counter):
+    # mongomock never goes through pymongo's command monitoring, so count at the collection
+    import mongomock  # type: ignore
+
+    def counted(method):
+        def wrapper(*args, **kwargs):
+            counter.count += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in MONGOMOCK_COMMANDS:
+        setattr(mongomock.Collection, name, counted(getattr(mongomock.Collection, name)))
+
+
+mongo_counter = MongoCommandCounter()
+if os.environ['MONGO_URI'].startswith('mongomock://'):
+    count_mongomock_calls(mongo_counter)
+else:
+    monitoring.register(mongo_counter)
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db, mongo  # noqa: E402
+from app.models import User, Job, Application  # noqa: E402
+
+
+class SQLCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def make_user(index, prefix):
+    return User(first_name=f'{prefix}{index}', last_name='Test', company_name='Test Co',
+                email=f'{prefix}{index}@example.com', phone_number='0600000000',
+                birthday='1990-01-01', password='secret')
+
+
+def seed(size):
+    """
+    Creates a recruiter with one job that has `size` applicants, and a candidate who
+    applied to `size` jobs.
+
+    Args:
+        size (int): The number of applicants and applications.
+
+    Returns:
+        tuple: The recruiter id, the job id and the candidate id.
+    """
+    recruiter = make_user(size, 'recruiter')
+    candidate = make_user(size, 'candidate')
+    applicants = [make_user(f'{size}-{i}', 'applicant') for i in range(size)]
+    db.session.add_all([recruiter, candidate] + applicants)
+    db.session.flush()
+
+    job = Job(title=f'Job {size}', location='Remote', description='Python developer', salary='1000', user_id=recruiter.id)
+    other_jobs = [Job(title=f'Other {size}-{i}', location='Remote', description='Data analyst', salary='1000',
+                      user_id=recruiter.id) for i in range(size)]
+    db.session.add_all([job] + other_jobs)
+    db.session.flush()
+
+    applications = [Application(user_id=applicant.id, job_id=job.id, message='0.7') for applicant in applicants]
+    applications += [Application(user_id=candidate.id, job_id=other.id, message='0.6') for other in other_jobs]
+    db.session.add_all(applications)
+    db.session.commit()
+
+    mongo.applications.insert_many([{
+        'application_id': str(application.id),
+        'user_id': str(application.user_id),
+        'job_id': str(application.job_id),
+        'responses': {'0': 'An answer'},
+        'feedback': [{'question': 'A question?', 'response': 'An answer', 'feedback': 'Good. Score: 7/10', 'score': 7}]
+    } for application in applications])
+    return recruiter.id, job.id, candidate.id
+
+
+def count_queries(app, engine, user_id, url):
+    """
+    Requests a URL as a signed-in user and counts the queries it issues.
+
+    Args:
+        app (Flask): The application under test.
+        engine (Engine): The SQLAlchemy engine to observe.
+        user_id (int): The signed-in user.
+        url (str): The URL to request.
+
+    Returns:
+        tuple: The number of SQL statements and MongoDB commands.
+    """
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+
+    sql_counter = SQLCounter()
+    event.listen(engine, 'before_cursor_execute', sql_counter)
+    mongo_counter.count = 0
+    try:
+        response = client.get(url)
+        assert response.status_code == 200, f"{url} returned {response.status_code}"
+    finally:
+        event.remove(engine, 'before_cursor_execute', sql_counter)
+    return sql_counter.count, mongo_counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['TESTING'] = True
+    failures = 0
+    try:
+        with app.app_context():
+            db.create_all()
+            engine = db.engine
+            seeded = {size: seed(size) for size in args.sizes}
+
+        endpoints = {
+            'view_candidates': lambda recruiter, job, candidate: (recruiter, f'/view_candidates/{job}'),
+            'get_job_data': lambda recruiter, job, candidate: (recruiter, f'/get_job_data/{job}'),
+            'view_applications': lambda recruiter, job, candidate: (candidate, '/view_applications'),
+        }
+        for name, target in endpoints.items():
+            counts = {}
+            for size, ids in seeded.items():
+                counts[size] = count_queries(app, engine, *target(*ids))
+            line = '  '.join(f"n={size}: {sql} SQL / {mongo} Mongo" for size, (sql, mongo) in counts.items())
+            constant = len(set(counts.values())) == 1
+            failures += not constant
+            print(f"{'OK  ' if constant else 'FAIL'} {name:<18} {line}")
+    finally:
+        mongo.client.drop_database(mongo.database.name)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Query latency of the job full-text index.
+
+Builds the in-process BM25 index over synthetic job postings and times keyword
+queries against it. For reference, the same queries are also run as the LIKE scan
+the listing used before, and through SQLite FTS5 when the sqlite3 build has it.
+No database, model or network access is needed.
+
+Run from the project root:
+    python -m benchmarks.search_latency --postings 100000 --queries 200
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+from app.search import InvertedIndex
+
+TITLES = ['Software Engineer', 'Data Scientist', 'Backend Developer', 'Frontend Developer', 'DevOps Engineer',
+          'Product Manager', 'Data Analyst', 'Machine Learning Engineer', 'QA Engineer', 'Mobile Developer',
+          'Site Reliability Engineer', 'Security Analyst', 'Cloud Architect', 'Technical Writer', 'UX Designer']
+SKILLS = ['python', 'java', 'javascript', 'typescript', 'react', 'angular', 'django', 'flask', 'spring', 'sql',
+          'postgresql', 'mongodb', 'redis', 'kafka', 'docker', 'kubernetes', 'terraform', 'aws', 'azure', 'gcp',
+          'pytorch', 'tensorflow', 'pandas', 'spark', 'airflow', 'go', 'rust', 'c++', 'c#', 'swift', 'kotlin',
+          'graphql', 'rest', 'microservices', 'linux', 'git', 'ci', 'agile', 'scrum', 'figma']
+FILLER = ['team', 'build', 'maintain', 'scalable', 'services', 'customers', 'product', 'experience', 'years',
+          'design', 'deliver', 'features', 'collaborate', 'engineers', 'ownership', 'quality', 'testing',
+          'performance', 'platform', 'data', 'pipelines', 'stakeholders', 'remote', 'hybrid', 'office', 'growth',
+          'mentoring', 'code', 'reviews', 'architecture', 'monitoring', 'production', 'startup', 'enterprise']
+
+
+def make_posting(rng):
+    title = rng.choice(TITLES)
+    words = [rng.choice(FILLER) for _ in range(rng.randint(60, 200))]
+    for _ in range(rng.randint(3, 8)):
+        words.insert(rng.randrange(len(words)), rng.choice(SKILLS))
+    return title, ' '.join(words)
+
+
+def make_query(rng):
+    terms = rng.sample(SKILLS, rng.randint(1, 2))
+    if rng.random() < 0.5:
+        terms.append(rng.choice(TITLES).split()[0].lower())
+    return ' '.join(terms)
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return {
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        'mean': statistics.mean(latencies) * 1000
+    }
+
+
+def time_queries(run, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        run(query)
+        latencies.append(time.perf_counter() - start)
+    return percentiles(latencies)
+
+
+def report(name, build_seconds, stats):
+    build = f"build {build_seconds:6.2f}s" if build_seconds is not None else ' ' * 13
+    print(f"{name:<14} {build}   p50 {stats['p50']:8.2f} ms   p95 {stats['p95']:8.2f} ms   mean {stats['mean']:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--postings', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    postings = [make_posting(rng) for _ in range(args.postings)]
+    queries = [make_query(rng) for _ in range(args.queries)]
+    print(f"{args.postings} postings, {args.queries} queries, top {args.k}")
+
+    start = time.perf_counter()
+    index = InvertedIndex()
+    for job_id, (title, description) in enumerate(postings, start=1):
+        index.add(job_id, title, description)
+    build_seconds = time.perf_counter() - start
+    report('bm25 index', build_seconds, time_queries(lambda query: index.search(query, args.k), queries))
+
+    # Incremental updates, as done by create_job/edit_job/delete_job
+    update_ids = rng.sample(range(1, args.postings + 1), min(1000, args.postings))
+    start = time.perf_counter()
+    for job_id in update_ids:
+        index.add(job_id, *make_posting(rng))
+    for job_id in update_ids:
+        index.remove(job_id)
+    print(f"{'':<14} {len(update_ids)} edits + deletes: {(time.perf_counter() - start) / (2 * len(update_ids)) * 1000:.3f} ms each")
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE job (id INTEGER PRIMARY KEY, title TEXT, description TEXT)')
+    connection.executemany('INSERT INTO job (title, description) VALUES (?, ?)', postings)
+
+    def like_scan(query):
+        term = query.split()[0]
+        return connection.execute('SELECT id FROM job WHERE title LIKE ? OR description LIKE ? LIMIT ?',
+                                  (f'%{term}%', f'%{term}%', args.k)).fetchall()
+
+    report('LIKE scan', None, time_queries(like_scan, queries))
+
+    try:
+        start = time.perf_counter()
+        connection.execute('CREATE VIRTUAL TABLE job_fts USING fts5(title, description)')
+        connection.execute('INSERT INTO job_fts (rowid, title, description) SELECT id, title, description FROM job')
+        fts_build_seconds = time.perf_counter() - start
+    except sqlite3.OperationalError:
+        print('sqlite3 was built without FTS5, skipping the FTS5 comparison')
+        return
+
+    def fts_search(query):
+        match = ' OR '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+        return connection.execute('SELECT rowid FROM job_fts WHERE job_fts MATCH ? ORDER BY bm25(job_fts) LIMIT ?',
+                                  (match, args.k)).fetchall()
+
+    report('sqlite fts5', fts_build_seconds, time_queries(fts_search, queries))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Measures startup cost of the application entry points.
+
+Reports the wall time of a CLI entry point that builds the app (like create_db.py),
+the time-to-first-request of a gunicorn worker, and the latency of the first request
+that needs the similarity model (which pays for lazy loading unless it was warmed up).
+
+Run from the project root:
+    python -m benchmarks.startup --runs 3
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import requests
+
+CLI_SNIPPET = "from app import create_app; create_app()"
+MODEL_SNIPPET = "from app.utils import warm_up_model; warm_up_model()"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_cli(snippet):
+    """
+    Times a Python snippet in a fresh interpreter.
+
+    Args:
+        snippet (str): The code to run.
+
+    Returns:
+        float: The wall time in seconds.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', snippet], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def time_web_worker(env_overrides, timeout=300):
+    """
+    Starts gunicorn and polls the sign-in page until it answers.
+
+    Args:
+        env_overrides (dict): Environment variables for the gunicorn process.
+        timeout (float): The maximum number of seconds to wait.
+
+    Returns:
+        float: The time to the first successful response in seconds.
+    """
+    port = free_port()
+    env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_WORKERS='1', **env_overrides)
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                requests.get(f'http://127.0.0.1:{port}/sign', timeout=1)
+                return time.perf_counter() - start
+            except requests.exceptions.RequestException:
+                time.sleep(0.05)
+        raise TimeoutError('gunicorn did not answer in time')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def report(label, samples):
+    print(f"{label:<44} median {statistics.median(samples):7.2f}s  min {min(samples):7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    report("CLI: create_app()", [time_cli(CLI_SNIPPET) for _ in range(args.runs)])
+    report("CLI: create_app() + first model use", [time_cli(f"{CLI_SNIPPET}; {MODEL_SNIPPET}") for _ in range(args.runs)])
+    report("gunicorn: lazy model", [time_web_worker({'PRELOAD_MODEL': 'false', 'WARM_UP_MODEL': 'false'}) for _ in range(args.runs)])
+    report("gunicorn: preloaded in master + warm-up", [time_web_worker({'PRELOAD_MODEL': 'true', 'WARM_UP_MODEL': 'true'}) for _ in range(args.runs)])
+
+
+if __name__ == '__main__':
+    main()
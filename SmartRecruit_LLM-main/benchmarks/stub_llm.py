@@ -0,0 +1,135 @@
+"""
+Local stand-in for the text-generation inference API.
+
+Answers question-generation prompts with 10 questions and feedback prompts with a short
+feedback ending in 'Score: X/10', after a configurable latency and with a configurable
+rate of 503 errors. Requests with "stream": true get the completion as server-sent
+token events like text-generation-inference sends them, one word every --token-ms;
+--no-stream makes the stub ignore the flag, like a backend without streaming support.
+Point the app at it with API_URL:
+
+    python -m benchmarks.stub_llm --port 8081 --latency-ms 300 --token-ms 20 --error-rate 0.05
+    API_URL=http://127.0.0.1:8081/ flask run
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_completion(prompt):
+    """
+    Builds a plausible completion for the prompts used by the app.
+
+    Args:
+        prompt (str): The prompt sent by the app.
+
+    Returns:
+        str: The generated text, echoing the prompt like the inference API does.
+    """
+    if 'personalized interview questions' in prompt:
+        questions = "\n".join(f"{i}. Can you describe your experience with topic number {i}?" for i in range(1, 11))
+        return f"{prompt}{questions}"
+    if '### Feedbacks:' in prompt:
+        count = len(re.findall(r'^### Question \d+:', prompt, flags=re.MULTILINE))
+        sections = "\n\n".join(
+            f"### Feedback {i}:\nThe candidate answered clearly and related the answer to the role. Score: {random.randint(4, 9)}/10"
+            for i in range(1, count + 1))
+        return f"{prompt}{sections}"
+    score = random.randint(4, 9)
+    return f"{prompt}The candidate answered clearly and related the answer to the role. Score: {score}/10"
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    token_latency = 0.0
+    error_rate = 0.0
+    streaming = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency)
+
+        if random.random() < self.error_rate:
+            self._send(503, {'error': 'Model is currently loading'})
+            return
+
+        request = json.loads(body or b'{}')
+        prompt = request.get('inputs', '')
+        completion = fake_completion(prompt)
+        if request.get('stream') and self.streaming:
+            self._stream(completion[len(prompt):])
+            return
+        time.sleep(self.token_latency * len(completion[len(prompt):].split()))
+        self._send(200, [{'generated_text': completion}])
+
+    def _stream(self, completion):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for token in re.findall(r'\s*\S+', completion):
+            time.sleep(self.token_latency)
+            event = {'token': {'text': token, 'special': False}, 'generated_text': None}
+            self.wfile.write(f"data:{json.dumps(event)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        event = {'token': {'text': '</s>', 'special': True}, 'generated_text': completion}
+        self.wfile.write(f"data:{json.dumps(event)}\n\n".encode('utf-8'))
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, latency=0.0, error_rate=0.0, token_latency=0.0, streaming=True):
+    """
+    Starts the stub server on a background thread.
+
+    Args:
+        port (int): The port to listen on, 0 for any free port.
+        latency (float): Seconds to wait before answering each request.
+        error_rate (float): Fraction of requests answered with a 503.
+        token_latency (float): Seconds per generated word.
+        streaming (bool): Whether to honour "stream": true requests.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its URL is http://127.0.0.1:<server.server_port>/.
+    """
+    handler = type('ConfiguredStubLLMHandler', (StubLLMHandler,), {
+        'latency': latency, 'error_rate': error_rate, 'token_latency': token_latency, 'streaming': streaming
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--token-ms', type=float, default=0)
+    parser.add_argument('--no-stream', action='store_true')
+    args = parser.parse_args()
+
+    server = start_stub_server(args.port, args.latency_ms / 1000, args.error_rate,
+                               args.token_ms / 1000, streaming=not args.no_stream)
+    print(f"Stub inference API listening on http://127.0.0.1:{server.server_port}/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
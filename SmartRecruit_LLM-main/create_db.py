@@ -1,7 +1,9 @@
-from app import create_app, db
+from flask_migrate import upgrade # type: ignore
+from app import create_app
 
 app = create_app()
 
 with app.app_context():
-    db.create_all()
+    # Same as `flask db upgrade`: creates the tables, or migrates an existing database
+    upgrade()
     print("Database created successfully!")
\ No newline at end of file
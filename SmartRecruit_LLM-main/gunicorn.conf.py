@@ -0,0 +1,29 @@
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# Import the app, and load the similarity model, once in the master so that
+# workers share the weights copy-on-write instead of each loading their own.
+preload_app = os.environ.get('PRELOAD_MODEL', 'true').lower() == 'true'
+warm_up_workers = os.environ.get('WARM_UP_MODEL', 'true').lower() == 'true'
+
+def when_ready(server):
+    if preload_app:
+        from app.utils import warm_up_model
+        # Only load the weights here: running torch ops before forking
+        # would start thread pools that the workers can't reuse.
+        warm_up_model(encode=False)
+        # Keep the preloaded objects out of the collector so it doesn't
+        # touch (and un-share) their pages in every worker.
+        gc.freeze()
+        server.log.info("Similarity model preloaded in master")
+
+def post_worker_init(worker):
+    if warm_up_workers:
+        from app.utils import warm_up_model
+        warm_up_model()
+        worker.log.info("Similarity model warmed up")
@@ -0,0 +1,30 @@
+"""add user cv_hash and cv_text
+
+Revision ID: 8a4e61c0f2d7
+Revises: 3f1c2a9d8b10
+Create Date: 2026-10-17 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e61c0f2d7'
+down_revision = '3f1c2a9d8b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Both stay empty for existing CVs until the next upload or `flask ingest-cvs`;
+    # until then the CV text is extracted on demand as before
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cv_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('cv_text', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('cv_text')
+        batch_op.drop_column('cv_hash')
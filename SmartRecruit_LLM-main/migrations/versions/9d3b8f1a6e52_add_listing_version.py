@@ -0,0 +1,32 @@
+"""add listing version
+
+Revision ID: 9d3b8f1a6e52
+Revises: e4a7d2b6c815
+Create Date: 2026-10-17 09:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b8f1a6e52'
+down_revision = 'e4a7d2b6c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('listing_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Start from the latest job change, so Last-Modified doesn't jump for existing listings
+    op.execute('INSERT INTO listing_version (id, version, updated_at) '
+               'SELECT 1, 0, COALESCE(MAX(updated_at), CURRENT_TIMESTAMP) FROM job')
+
+
+def downgrade():
+    op.drop_table('listing_version')
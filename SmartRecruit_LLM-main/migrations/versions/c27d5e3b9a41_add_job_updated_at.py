@@ -0,0 +1,34 @@
+"""add job updated_at
+
+Revision ID: c27d5e3b9a41
+Revises: 8a4e61c0f2d7
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27d5e3b9a41'
+down_revision = '8a4e61c0f2d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Existing jobs count as last edited when they were posted
+    op.execute('UPDATE job SET updated_at = date_posted WHERE updated_at IS NULL')
+
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_job_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_updated_at'))
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,28 @@
+"""add job keyset pagination indexes
+
+Revision ID: e4a7d2b6c815
+Revises: 5b9f0e7c3d26
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7d2b6c815'
+down_revision = '5b9f0e7c3d26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.create_index('ix_job_date_posted_id', ['date_posted', 'id'], unique=False)
+        batch_op.create_index('ix_job_user_id_date_posted_id', ['user_id', 'date_posted', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_user_id_date_posted_id')
+        batch_op.drop_index('ix_job_date_posted_id')